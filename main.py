@@ -1,7 +1,13 @@
+import os
+
 from fastapi.responses import RedirectResponse
 from mangum import Mangum
 
 from src import app
+from src.apis import memory
+from src.config import env
+from src.db import pool
+from src.middleware import visits
 from src.models import FaunaModel
 
 
@@ -12,6 +18,23 @@ async def startup():
     except Exception as e:
         print(e)
 
+# Mangum runs the lifespan around every Lambda invocation, so a "shutdown" there
+# ends a request, not the process: keep the pool's connections for the next one.
+ON_LAMBDA = "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+
+@app.on_event("shutdown")
+async def shutdown():
+    if ON_LAMBDA:
+        # Nothing runs once an invocation returns, so write-behind queues only
+        # flush while one is running. Young items wait to batch with later
+        # invocations; items older than WRITE_BEHIND_MAX_AGE are flushed now.
+        await visits.settle(env.WRITE_BEHIND_MAX_AGE)
+        await memory.settle(env.WRITE_BEHIND_MAX_AGE)
+        return
+    await visits.close()
+    await memory.close()
+    await pool.close()
+
 @app.get("/")
 async def index():
     return RedirectResponse(url="/docs")
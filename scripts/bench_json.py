@@ -0,0 +1,75 @@
+"""
+Compares the Fauna query encodings on typical ODM queries.
+
+    python -m scripts.bench_json [iterations]
+
+Run from the repository root with the app's `.env` available, since importing
+`src` loads the settings.
+"""
+import sys
+import timeit
+from json import loads
+
+from src.db import QueryTemplate, param, q
+from src.db.json import orjson, to_json, to_wire
+from src.models import Lead
+
+
+def queries():
+    lead = Lead(lead_id="4f1c2a", ipaddr="203.0.113.7", geo_data={"country": "PE"})
+    leads = [
+        Lead(lead_id=str(i), ipaddr="203.0.113.7").dict(exclude={"ref", "ts"})
+        for i in range(100)
+    ]
+    return {
+        "find_unique": q.get(q.match(q.index("user_sub_unique"), "auth0|1234")),
+        "create": Lead._create_query(lead.dict(), lead.__dict__.__getitem__),
+        "page": q.map_(
+            q.lambda_("ref", q.get(q.var("ref"))),
+            q.paginate(q.match(q.index("lead")), size=64),
+        ),
+        "create_many x100": q.map_(
+            q.lambda_(
+                "data",
+                Lead._create_query(
+                    q.var("data"), lambda field: q.select(field, q.var("data"))
+                ),
+            ),
+            leads,
+        ),
+    }
+
+
+def main(iterations: int):
+    encoders = {
+        "to_json (pretty)": to_json,
+        "to_json (compact)": lambda expr: to_json(expr, pretty=False),
+        "to_wire": to_wire,
+    }
+    print(f"orjson: {'yes' if orjson is not None else 'no'}")
+    for name, expr in queries().items():
+        assert loads(to_wire(expr)) == loads(to_json(expr))
+        print(f"\n{name}")
+        for label, encode in encoders.items():
+            size = len(encode(expr))
+            seconds = timeit.timeit(lambda: encode(expr), number=iterations)
+            print(
+                f"  {label:<18} {size:>7} bytes {seconds / iterations * 1e6:>9.1f} us"
+            )
+
+    template = QueryTemplate(q.get(q.match(q.index("user_sub_unique"), param("value"))))
+    print("\nfind_unique, built per call vs. template")
+    for label, encode in {
+        "build + to_wire": lambda: to_wire(
+            q.get(q.match(q.index("user_sub_unique"), "auth0|1234"))
+        ),
+        "template.render": lambda: template.render(value="auth0|1234"),
+    }.items():
+        seconds = timeit.timeit(encode, number=iterations)
+        print(
+            f"  {label:<18} {len(encode()):>7} bytes {seconds / iterations * 1e6:>9.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -1,5 +1,7 @@
+from .memory import *
 from .openai import *
 from .pinecone import *
 
 openai = OpenAIClient() 
-pinecone = PineConeClient()
\ No newline at end of file
+pinecone = PineConeClient()
+memory = MemoryWriter(openai, pinecone)
@@ -0,0 +1,90 @@
+from ..config import env
+from ..models import *
+from ..tools.writebehind import WriteBehindQueue
+from .openai import OpenAIClient
+from .pinecone import PineConeClient, PineconeVector
+
+
+class MemoryWrite(BaseModel):
+    """
+    A class used to represent a pending "learned memory" write to Pinecone.
+
+    Attributes
+    ----------
+    namespace : str
+        The namespace of the embedding.
+    text : str
+        The text to remember.
+    vector : Optional[Vector]
+        The embedding of the text, if already known. Otherwise it is embedded on flush.
+    id : Optional[str]
+        The ID of the embedding. A random ID is used when missing.
+    """
+
+    namespace: str = Field(..., description="The namespace of the embedding.")
+    text: str = Field(..., description="The text to remember.")
+    vector: Optional[Vector] = Field(
+        default=None, description="The embedding of the text, if already known."
+    )
+    id: Optional[str] = Field(default=None, description="The ID of the embedding.")
+
+
+class MemoryWriter:
+    """
+    Write-behind queue for the questions and answers the chatbot learns from.
+
+    Writes are buffered off the request path and flushed in batches: texts
+    without a vector are embedded with one batched call, then every namespace
+    is upserted with `PineConeClient.upsert_many`.
+    """
+
+    def __init__(self, openai: OpenAIClient, pinecone: PineConeClient):
+        self.openai = openai
+        self.pinecone = pinecone
+        self.queue: WriteBehindQueue[MemoryWrite] = WriteBehindQueue(
+            self.write,
+            maxsize=env.MEMORY_QUEUE_SIZE,
+            batch_size=env.MEMORY_BATCH_SIZE,
+            interval=env.MEMORY_FLUSH_INTERVAL,
+        )
+
+    def remember(
+        self,
+        namespace: str,
+        text: str,
+        vector: Optional[Vector] = None,
+        id: Optional[str] = None,
+    ) -> bool:
+        return self.queue.put(
+            MemoryWrite(namespace=namespace, text=text, vector=vector, id=id)
+        )
+
+    async def write(self, writes: List[MemoryWrite]):
+        missing = [write for write in writes if write.vector is None]
+        if missing:
+            vectors = await self.openai.post_embeddings_batch(
+                [write.text for write in missing]
+            )
+            for write, vector in zip(missing, vectors):
+                write.vector = vector
+        namespaces: Dict[str, List[PineconeVector]] = {}
+        for write in writes:
+            vector = PineconeVector(values=write.vector, metadata={"text": write.text})
+            if write.id is not None:
+                vector.id = write.id
+            namespaces.setdefault(write.namespace, []).append(vector)
+        for namespace, vectors in namespaces.items():
+            report = await self.pinecone.upsert_many(namespace, vectors)
+            if report.failures:
+                raise RuntimeError(
+                    f"{len(report.failures)} upsert chunks failed for {namespace}"
+                )
+
+    def stats(self) -> Dict[str, int]:
+        return self.queue.stats()
+
+    async def settle(self, max_age: float):
+        await self.queue.settle(max_age)
+
+    async def close(self):
+        await self.queue.close()
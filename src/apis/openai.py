@@ -1,3 +1,7 @@
+import asyncio
+import contextvars
+import json
+
 from ..config import env
 from ..models import *
 from ..tools import *
@@ -22,6 +26,22 @@ class OpenAIEmbeddingRequest(BaseModel):
     namespace: str = Field(..., description="The namespace of the embedding.")
 
 
+class OpenAIEmbeddingBatchRequest(BaseModel):
+    """
+    A class used to represent a request for many OpenAI embeddings in one call.
+
+    Attributes
+    ----------
+    model : str
+        The model to be used for the embeddings. Default is "text-embedding-ada-002".
+    input : List[str]
+        The texts to be embedded.
+    """
+
+    model: str = Field(default="text-embedding-ada-002")
+    input: List[str] = Field(..., description="The texts to embed")
+
+
 class OpenAIEmbeddingObject(BaseModel):
     """
     A class used to represent an OpenAI embedding object.
@@ -126,6 +146,8 @@ class OpenAIChatGptRequest(BaseModel):
         What we call the 'creativity' of the AI. 0.0 is very conservative (highly repetitive), 1.0 is very creative (may say strange things or diverge from the topic at hand).
     n : int
         The number of completions to generate for each prompt.
+    stream : bool
+        Whether to stream back partial message deltas as server-sent events.
     """
 
     model: str = Field(
@@ -158,6 +180,10 @@ class OpenAIChatGptRequest(BaseModel):
     n: int = Field(
         default=1, description="The number of completions to generate for each prompt."
     )
+    stream: bool = Field(
+        default=False,
+        description="Whether to stream back partial message deltas as server-sent events.",
+    )
 
     def chain(self, content: str, prompt: str):
         self.messages = [
@@ -306,24 +332,193 @@ headers = {
     "Authorization": f"Bearer {env.OPENAI_API_KEY}",
 }
 
+EMBEDDING_MAX_INPUTS = 2048
+EMBEDDING_MAX_INPUT_TOKENS = 8191
+EMBEDDING_MAX_REQUEST_TOKENS = 250000
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate (~3 characters per token) used for packing."""
+    return len(text) // 3 + 1
+
+
+def completion_tokens(request: OpenAIChatGptRequest) -> int:
+    """Tokens a chat completion may spend: its estimated prompt plus `max_tokens`."""
+    return (
+        sum(estimate_tokens(message.content) for message in request.messages)
+        + request.max_tokens
+    )
+
+
+def pack_embedding_inputs(inputs: List[str]) -> List[List[int]]:
+    """
+    Groups input positions into batches that fit the `/v1/embeddings` limits,
+    both in number of inputs and in estimated tokens per request.
+    """
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    tokens = 0
+    for position, text in enumerate(inputs):
+        cost = min(estimate_tokens(text), EMBEDDING_MAX_INPUT_TOKENS)
+        if batch and (
+            len(batch) >= EMBEDDING_MAX_INPUTS
+            or tokens + cost > EMBEDDING_MAX_REQUEST_TOKENS
+        ):
+            batches.append(batch)
+            batch, tokens = [], 0
+        batch.append(position)
+        tokens += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class EmbeddingCoalescer:
+    """
+    Merges concurrent single-text embedding calls into one batched request.
+
+    Calls arriving within `window` seconds of each other (or until `max_batch`
+    texts are queued) share a single `/v1/embeddings` round trip.
+    """
+
+    def __init__(self, client: "OpenAIClient", window: float, max_batch: int):
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+
+    async def embed(self, text: str, model: str) -> Vector:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.setdefault(model, []).append((text, future))
+        if len(self._pending[model]) >= self.max_batch:
+            self._flush(model)
+        elif model not in self._timers:
+            self._timers[model] = loop.call_later(self.window, self._flush, model)
+        return await future
+
+    def _flush(self, model: str):
+        timer = self._timers.pop(model, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(model, [])
+        if batch:
+            # Send outside the context of whichever caller triggered the flush, so
+            # the shared batch isn't bound by that one caller's deadline. Each
+            # caller still gives up on its own deadline while awaiting its future.
+            contextvars.Context().run(asyncio.ensure_future, self._send(model, batch))
+
+    async def _send(self, model: str, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            vectors = await self.client.post_embeddings_batch(
+                [text for text, _ in batch], model=model
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
 
 class OpenAIClient(ApiClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        scheduler.configure(
+            "api.openai.com",
+            rpm=env.OPENAI_RPM,
+            tpm=env.OPENAI_TPM,
+            retries=env.API_MAX_RETRIES,
+        )
+        self.coalescer = EmbeddingCoalescer(
+            self, env.EMBEDDING_BATCH_WINDOW, env.EMBEDDING_BATCH_SIZE
+        )
+        self.embeddings = EmbeddingStore(
+            env.EMBEDDING_CACHE_DIR or None, env.EMBEDDING_CACHE_SIZE
+        )
+
+    async def embed(self, request: OpenAIEmbeddingRequest) -> Vector:
+        """Embeds a single text, from the embedding store or coalesced with concurrent calls."""
+        vector = self.embeddings.get(embedding_key(request.model, request.input))
+        if vector is not None:
+            return vector
+        return await self.coalescer.embed(request.input, request.model)
+
+    async def post_embeddings_batch(
+        self, inputs: List[str], model: str = "text-embedding-ada-002"
+    ) -> List[Vector]:
+        """
+        Embeds many texts in as few requests as the API limits allow and
+        returns the vectors in input order. Duplicate texts are embedded once,
+        and texts already in the embedding store are not embedded at all.
+        """
+        keys = {text: embedding_key(model, text) for text in inputs}
+        vectors: Dict[str, Vector] = {}
+        for text, key in keys.items():
+            vector = self.embeddings.get(key)
+            if vector is not None:
+                vectors[text] = vector
+        unique = [text for text in keys if text not in vectors]
+        if not unique:
+            return [vectors[text] for text in inputs]
+        truncated = [text[: EMBEDDING_MAX_INPUT_TOKENS * 3] for text in unique]
+        batches = pack_embedding_inputs(truncated)
+
+        async def send(batch: List[int]):
+            response = await self.fetch(
+                "https://api.openai.com/v1/embeddings",
+                "POST",
+                headers,
+                OpenAIEmbeddingBatchRequest(
+                    model=model, input=[truncated[i] for i in batch]
+                ).dict(),
+                tokens=sum(estimate_tokens(truncated[i]) for i in batch),
+            )
+            assert isinstance(response, dict)
+            # Stored as soon as it arrives, so a later failing batch doesn't
+            # throw away the vectors already paid for.
+            for item in OpenAIEmbeddingResponse(**response).data:
+                text = unique[batch[item.index]]
+                vectors[text] = item.embedding
+                self.embeddings.set(keys[text], item.embedding)
+
+        results = await asyncio.gather(
+            *[send(batch) for batch in batches], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return [vectors[text] for text in inputs]
+
     async def post_embeddings(
         self, request: OpenAIEmbeddingRequest
     ) -> OpenAIEmbeddingResponse:
+        key = embedding_key(request.model, request.input)
+        vector = self.embeddings.get(key)
+        if vector is not None:
+            return OpenAIEmbeddingResponse(
+                object="list",
+                data=[OpenAIEmbeddingObject(object="embedding", index=0, embedding=vector)],
+                model=request.model,
+                usage=OpenAIEmbeddingUsage(prompt_tokens=0, total_tokens=0),
+            )
         response = await self.fetch(
-            "https://api.openai.com/v1/embeddings", "POST", headers, request.dict()
+            "https://api.openai.com/v1/embeddings",
+            "POST",
+            headers,
+            request.dict(),
+            tokens=estimate_tokens(request.input),
         )
         assert isinstance(response, dict)
-        return OpenAIEmbeddingResponse(**response)
+        embedding_response = OpenAIEmbeddingResponse(**response)
+        self.embeddings.set(key, embedding_response.data[0].embedding)
+        return embedding_response
 
     async def retrieve_context(self, request: OpenAIEmbeddingRequest):
-        response = await self.fetch(
-            "https://api.openai.com/v1/embeddings", "POST", headers, request.dict()
-        )
-        assert isinstance(response, dict)
-        embedding_response = OpenAIEmbeddingResponse(**response)
-        vector = embedding_response.data[0].embedding
+        vector = await self.embed(request)
         namespace = request.namespace
         return OpenAIPineConeRequest(namespace=namespace, vector=vector)
 
@@ -335,6 +530,26 @@ class OpenAIClient(ApiClient):
             "POST",
             headers,
             request.dict(),
+            tokens=completion_tokens(request),
         )
         assert isinstance(response, dict)
         return OpenAIChatCompletionResponse(**response)
+
+    async def stream_completion(
+        self, request: OpenAIChatGptRequest
+    ) -> AsyncGenerator[str, None]:
+        """Yields the completion's content deltas as they arrive."""
+        request.stream = True
+        async for payload in self.events(
+            "https://api.openai.com/v1/chat/completions",
+            "POST",
+            headers,
+            request.dict(),
+            tokens=completion_tokens(request),
+        ):
+            if payload.strip() == b"[DONE]":
+                return
+            delta = json.loads(payload)["choices"][0].get("delta", {})
+            content = delta.get("content")
+            if content:
+                yield content
@@ -1,3 +1,5 @@
+import asyncio
+
 from ..config import env
 from ..models import *
 from ..tools import *
@@ -125,11 +127,76 @@ class PineconeVectorResponse(BaseModel):
     namespace: str = Field(..., description="The namespace of the embedding.")
 
 
+class PineconeUpsertFailure(BaseModel):
+    """
+    A class used to represent a chunk of vectors that could not be upserted.
+
+    Attributes
+    ----------
+    chunk : int
+        The position of the chunk within the bulk upsert.
+    ids : List[str]
+        The IDs of the vectors in the chunk.
+    error : str
+        The reason the chunk failed.
+    """
+
+    chunk: int = Field(..., description="The position of the chunk within the bulk upsert.")
+    ids: List[str] = Field(..., description="The IDs of the vectors in the chunk.")
+    error: str = Field(..., description="The reason the chunk failed.")
+
+
+class PineconeBulkUpsertReport(BaseModel):
+    """
+    A class used to represent the outcome of a bulk upsert.
+
+    Attributes
+    ----------
+    upserted : int
+        The number of vectors Pinecone acknowledged.
+    chunks : int
+        The number of requests the vectors were split into.
+    failures : List[PineconeUpsertFailure]
+        The chunks that failed.
+    """
+
+    upserted: int = Field(default=0, description="The number of vectors Pinecone acknowledged.")
+    chunks: int = Field(default=0, description="The number of requests the vectors were split into.")
+    failures: List[PineconeUpsertFailure] = Field(
+        default_factory=list, description="The chunks that failed."
+    )
+
+
 headers = {
     "Content-Type": "application/json",
     "api-key": env.PINECONE_API_KEY,
 }
 
+UPSERT_MAX_VECTORS = 100
+UPSERT_MAX_BYTES = 1_800_000
+UPSERT_CONCURRENCY = 8
+
+
+def chunk_vectors(
+    vectors: List[PineconeVector],
+    max_vectors: int = UPSERT_MAX_VECTORS,
+    max_bytes: int = UPSERT_MAX_BYTES,
+) -> List[List[PineconeVector]]:
+    """Splits vectors into chunks bounded by vector count and serialized size."""
+    chunks: List[List[PineconeVector]] = []
+    chunk: List[PineconeVector] = []
+    size = 0
+    for vector in vectors:
+        vector_size = len(vector.json())
+        if chunk and (len(chunk) >= max_vectors or size + vector_size > max_bytes):
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(vector)
+        size += vector_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
 
 class PineConeClient(ApiClient):
     """
@@ -148,6 +215,10 @@ class PineConeClient(ApiClient):
         Upserts a vector to the Pinecone service. The vector is defined in the `PineconeVectorUpsert` request object.
         This method sends a POST request to the "/vectors/upsert" endpoint of the Pinecone API.
 
+    async upsert_many(namespace: str, vectors: List[PineconeVector]) -> PineconeBulkUpsertReport:
+        Upserts many vectors, split into chunks bounded by vector count and payload bytes.
+        Chunks are sent with bounded concurrency and failed chunks are reported rather than raised.
+
     async query(request: PineconeVectorQuery) -> PineconeVectorResponse:
         Queries the Pinecone service with a vector. The vector is defined in the `PineconeVectorQuery` request object.
         This method sends a POST request to the "/query" endpoint of the Pinecone API and returns a `PineconeVectorResponse` object.
@@ -161,6 +232,44 @@ class PineConeClient(ApiClient):
             json=PineconeVectorUpsert(namespace=namespace, vectors=[request]).dict(),
         )
 
+    async def upsert_many(
+        self,
+        namespace: str,
+        vectors: List[PineconeVector],
+        max_vectors: int = UPSERT_MAX_VECTORS,
+        max_bytes: int = UPSERT_MAX_BYTES,
+        concurrency: int = UPSERT_CONCURRENCY,
+    ) -> PineconeBulkUpsertReport:
+        chunks = chunk_vectors(vectors, max_vectors, max_bytes)
+        semaphore = asyncio.Semaphore(concurrency)
+        report = PineconeBulkUpsertReport(chunks=len(chunks))
+
+        async def send(position: int, chunk: List[PineconeVector]):
+            async with semaphore:
+                try:
+                    response = await self.fetch(
+                        "https://langchain-8360578.svc.us-central1-gcp.pinecone.io/vectors/upsert",
+                        "POST",
+                        headers,
+                        json=PineconeVectorUpsert(namespace=namespace, vectors=chunk).dict(),
+                    )
+                    error = f"Unexpected response: {response!r}"
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    response = None
+                    error = repr(exc)
+            if isinstance(response, dict) and "upsertedCount" in response:
+                report.upserted += response["upsertedCount"]
+            else:
+                report.failures.append(
+                    PineconeUpsertFailure(
+                        chunk=position, ids=[vector.id for vector in chunk], error=error
+                    )
+                )
+
+        await asyncio.gather(*[send(i, chunk) for i, chunk in enumerate(chunks)])
+        report.failures.sort(key=lambda failure: failure.chunk)
+        return report
+
     async def query(self, request: PineconeVectorQuery):
         response = await self.fetch(
             "https://langchain-8360578.svc.us-central1-gcp.pinecone.io/query",
@@ -171,10 +280,8 @@ class PineConeClient(ApiClient):
         assert isinstance(response, dict)
         return PineconeVectorResponse(**response)
 
-    async def get_context(self, namespace: str, text: str, vector: Vector):
+    async def get_context(self, namespace: str, vector: Vector):
         query_request = PineconeVectorQuery(namespace=namespace, vector=vector)
-        upsert_request = PineconeVector(id=text, values=vector, metadata={"text": text})
         query_response = await self.query(query_request)
-        await self.upsert(namespace,upsert_request)
         matches = query_response.matches
         return {match.metadata["text"]: f"Score {match.score}" for match in matches}
@@ -17,6 +17,30 @@ class Env(BaseSettings):
     AWS_ACCESS_KEY_ID: str = Data(..., env="AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY:str = Data(..., env="AWS_SECRET_ACCESS_KEY")
     REGION_NAME:str = Data(..., env="REGION_NAME")
+    EMBEDDING_BATCH_WINDOW: float = Data(default=0.005, env="EMBEDDING_BATCH_WINDOW")
+    EMBEDDING_BATCH_SIZE: int = Data(default=256, env="EMBEDDING_BATCH_SIZE")
+    EMBEDDING_CACHE_DIR: str = Data(default="/tmp/embeddings", env="EMBEDDING_CACHE_DIR")
+    EMBEDDING_CACHE_SIZE: int = Data(default=4096, env="EMBEDDING_CACHE_SIZE")
+    CHATBOT_CACHE_BACKEND: str = Data(default="memory", env="CHATBOT_CACHE_BACKEND")
+    CHATBOT_CACHE_TTL: float = Data(default=3600, env="CHATBOT_CACHE_TTL")
+    CHATBOT_CACHE_SIZE: int = Data(default=1024, env="CHATBOT_CACHE_SIZE")
+    CHATBOT_CACHE_THRESHOLD: float = Data(default=0.95, env="CHATBOT_CACHE_THRESHOLD")
+    CHATBOT_CACHE_CANDIDATES: int = Data(default=64, env="CHATBOT_CACHE_CANDIDATES")
+    MEMORY_QUEUE_SIZE: int = Data(default=10000, env="MEMORY_QUEUE_SIZE")
+    MEMORY_BATCH_SIZE: int = Data(default=100, env="MEMORY_BATCH_SIZE")
+    MEMORY_FLUSH_INTERVAL: float = Data(default=1.0, env="MEMORY_FLUSH_INTERVAL")
+    GEOIP_DATABASE: str = Data(default="geoip.bin", env="GEOIP_DATABASE")
+    GEOIP_CACHE_SIZE: int = Data(default=4096, env="GEOIP_CACHE_SIZE")
+    LEAD_QUEUE_SIZE: int = Data(default=10000, env="LEAD_QUEUE_SIZE")
+    LEAD_BATCH_SIZE: int = Data(default=200, env="LEAD_BATCH_SIZE")
+    LEAD_FLUSH_INTERVAL: float = Data(default=5.0, env="LEAD_FLUSH_INTERVAL")
+    WRITE_BEHIND_MAX_AGE: float = Data(default=30.0, env="WRITE_BEHIND_MAX_AGE")
+    OPENAI_RPM: int = Data(default=3500, env="OPENAI_RPM")
+    OPENAI_TPM: int = Data(default=350000, env="OPENAI_TPM")
+    API_MAX_RETRIES: int = Data(default=4, env="API_MAX_RETRIES")
+    CHATBOT_DEADLINE: float = Data(default=25.0, env="CHATBOT_DEADLINE")
+    CHATBOT_EMBEDDING_TIMEOUT: float = Data(default=3.0, env="CHATBOT_EMBEDDING_TIMEOUT")
+    CHATBOT_RETRIEVAL_TIMEOUT: float = Data(default=3.0, env="CHATBOT_RETRIEVAL_TIMEOUT")
     
     def __init__(self):
         super().__init__()
@@ -5,8 +5,16 @@ from pydantic import BaseModel
 from pydantic import Field as field
 
 from . import query as q
+from .cache import ModelCache
 from .client import ApiClient, FaunaClient
+from .deadline import DeadlineExceeded, deadline, remaining
+from .errors import FaunaException
 from .fields import Field
+from .identity import IdentityMap, identity_map
 from .json import FaunaJSONEncoder
 from .odm import FaunaModel
+from .pool import ConnectionPool, pool
+from .scheduler import ApiError, CircuitOpenError, Scheduler, scheduler
+from .subscription import Subscription
+from .template import QueryTemplate, param
 from .typedefs import LazyProxy
\ No newline at end of file
@@ -0,0 +1,113 @@
+import asyncio
+from collections import OrderedDict
+from copy import copy
+from time import monotonic
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from pydantic import BaseModel
+
+from . import query as q
+from .client import FaunaClient
+from .subscription import Subscription
+
+_caches: Dict[str, "ModelCache"] = {}
+
+
+def _copy_one(item: Any) -> Any:
+    # copy.copy() of a pydantic model shares its __dict__; .copy() doesn't.
+    return item.copy() if isinstance(item, BaseModel) else copy(item)
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_copy_one(item) for item in value]
+    return _copy_one(value)
+
+
+class ModelCache:
+    """
+    Process-wide TTL cache of a model's lookups, bounded to `maxsize` entries
+    with least-recently-used eviction.
+
+    Enabled per model through its pydantic `Config`:
+
+        class Config:
+            cache_ttl = 300       # seconds, required to enable the cache
+            cache_maxsize = 1024  # entries
+            cache_stream = True   # also clear the cache on collection events
+
+    Cached models are copied on the way in and out, so callers can't mutate
+    shared state.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._watcher: Optional[asyncio.Task] = None
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_model(cls, model: Any) -> Optional["ModelCache"]:
+        config = model.__config__
+        ttl = getattr(config, "cache_ttl", None)
+        if not ttl:
+            return None
+        name = model.__name__.lower()
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = cls(ttl, getattr(config, "cache_maxsize", 1024))
+        if getattr(config, "cache_stream", False):
+            cache.watch(model.client(), name)
+        return cache
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _copy(entry[1])
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Caches a copy of `value`. When given, `generation` is the cache's
+        `generation` from before the value was loaded: if the cache was cleared
+        since, the value may be stale and isn't stored.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (monotonic() + self.ttl, _copy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.generation += 1
+
+    def watch(self, client: FaunaClient, collection: str):
+        """Clears the cache on every event of `collection`."""
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.ensure_future(self._watch(client, collection))
+
+    async def _watch(self, client: FaunaClient, collection: str):
+        subscription = Subscription.of(client, q.documents(q.collection(collection)))
+        # Every reconnect starts with a start event, and events may have been
+        # missed while disconnected, so start events clear the cache too.
+        async for _ in subscription.listen():
+            self.clear()
+
+    def close(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+
+def clear_model_cache(name: str):
+    cache = _caches.get(name)
+    if cache is not None:
+        cache.clear()
@@ -1,14 +1,18 @@
 import base64
-import io
+import codecs
 import os
 from typing import Any, AsyncGenerator, Dict, List, Literal, Optional, Union
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout
 from dotenv import load_dotenv
 
+from .deadline import remaining
 from .errors import FaunaException
-from .json import to_json
+from .json import loads_bytes, to_wire
 from .objects import Expr
+from .pool import pool
+from .scheduler import ApiError, retry_after, scheduler
+from .stream import EventStreamParser, parse_event
 from .typedefs import LazyProxy
 
 load_dotenv()
@@ -20,76 +24,90 @@ Headers = Dict[str, str]
 MaybeHeaders = Optional[Headers]
 
 
-class FaunaClient(LazyProxy[ClientSession]):
-    def __init__(self, secret=None):
-        if secret is None:
-            secret = os.getenv("FAUNA_SECRET")
-        self.secret = secret
+class PooledClient(LazyProxy[ClientSession]):
+    """Base for clients that borrow the process-wide pooled `ClientSession`."""
 
     def __load__(self) -> ClientSession:
-        return ClientSession()
-
-    async def query(self, expr: Expr) -> MaybeJson:
-        async with self.__load__() as session:
-            async with session.post(
-                "https://db.fauna.com",
-                data=to_json(expr),
-                headers={
-                    "Authorization": f"Bearer {self.secret}",
-                    "Content-type": "application/json",
-                    "Accept": "application/json",
-                },
-            ) as response:
-                try:
-                    data = await response.json()
+        return pool.session()
 
-                    return data["resource"]
+    @property
+    def session(self) -> ClientSession:
+        # Always ask the pool, which replaces a closed session or one bound to
+        # another event loop.
+        return pool.session()
 
-                except (
-                    FaunaException,
-                    ValueError,
-                    KeyError,
-                    TypeError,
-                    Exception,
-                ) as exc:  # pylint:disable=all
-                    return None
-
-    async def stream(self, expr: Expr) -> AsyncGenerator[str, None]:
-        async with self.__load__() as session:
-            async with session.post(
-                "https://db.fauna.com",
-                data=to_json(expr),
-                headers={
-                    "Authorization": f"Bearer {self.secret}",
-                    "Content-type": "application/json",
-                    "Accept": "text/event-stream",
-                    "Keep-Alive": "timeout=5, max=900",
-                    "Connection": "keep-alive",
-                    "Cache-Control": "no-cache",
-                    "X-Last-Seen-Txn": "0",
-                    "X-Request-By": "aiofauna",
-                    "X-Query-By": "aiofauna",
-                },
-            ) as response:
-                with io.StringIO() as buffer:
-                    async for chunk in response.content.iter_chunked(1024):
-                        buffer.write(chunk.decode())
-
-                        buffer.seek(0)
 
-                        for line in buffer:
-                            if line == "\r\n":
-                                yield buffer.getvalue()
+class FaunaClient(PooledClient):
+    def __init__(self, secret=None):
+        super().__init__()
+        if secret is None:
+            secret = os.getenv("FAUNA_SECRET")
+        self.secret = secret
 
-                                buffer.seek(0)
+    async def query(self, expr: Union[Expr, bytes]) -> MaybeJson:
+        """Runs a query, given as an expression or as already serialized JSON."""
+        async with self.session.post(
+            "https://db.fauna.com",
+            data=expr if isinstance(expr, bytes) else to_wire(expr),
+            timeout=pool.timeout_within(remaining()),
+            headers={
+                "Authorization": f"Bearer {self.secret}",
+                "Content-type": "application/json",
+                "Accept": "application/json",
+            },
+        ) as response:
+            try:
+                return loads_bytes(await response.read())["resource"]
 
-                                buffer.truncate()
+            except (
+                FaunaException,
+                ValueError,
+                KeyError,
+                TypeError,
+                Exception,
+            ) as exc:  # pylint:disable=all
+                return None
 
-                            else:
-                                yield line
+    async def stream(
+        self, expr: Expr, last_seen_txn: Optional[int] = None
+    ) -> AsyncGenerator[Any, None]:
+        """
+        Yields the decoded events of a Fauna event stream on `expr`, read at or
+        after `last_seen_txn` when given.
+        """
+        headers = {
+            "Authorization": f"Bearer {self.secret}",
+            "Content-type": "application/json",
+            "Accept": "text/event-stream",
+            "Keep-Alive": "timeout=5, max=900",
+            "Connection": "keep-alive",
+            "Cache-Control": "no-cache",
+            "X-Request-By": "aiofauna",
+            "X-Query-By": "aiofauna",
+        }
+        if last_seen_txn is not None:
+            headers["X-Last-Seen-Txn"] = str(last_seen_txn)
+        async with self.session.post(
+            "https://db.fauna.com/stream",
+            data=to_wire(expr),
+            headers=headers,
+            # Streams may stay idle indefinitely between events.
+            timeout=ClientTimeout(total=None, connect=pool.timeout.connect),
+        ) as response:
+            if response.status >= 400:
+                # An error body is JSON too; don't let it pass for an event.
+                raise FaunaException(
+                    response.status, (await response.text())[:500], None
+                )
+            parser = EventStreamParser()
+            async for chunk in response.content.iter_any():
+                for payload in parser.feed(chunk):
+                    yield parse_event(payload)
+            for payload in parser.close():
+                yield parse_event(payload)
 
 
-class ApiClient(LazyProxy[ClientSession]):
+class ApiClient(PooledClient):
     """
 
     Generic HTTP Client
@@ -103,37 +121,49 @@ class ApiClient(LazyProxy[ClientSession]):
         self.base_url = base_url
         self.headers = headers
 
-    def __load__(self) -> ClientSession:
-        return ClientSession()
-
     async def fetch(
         self,
         url: str,
         method: Method = "GET",
         headers: MaybeHeaders = None,
         json: MaybeJson = None,
+        tokens: float = 0,
     ) -> MaybeJson:
+        """
+        Sends a JSON request under the host's rate limits and retry policy, spending
+        `tokens` from its tokens-per-minute budget. Raises `ApiError` once the
+        call has failed for good.
+        """
         if self.base_url is not None:
             url = self.base_url + url
         if self.headers is not None and headers is not None:
             headers = {**self.headers, **headers}
         elif self.headers is not None:
             headers = self.headers
-        async with self.__load__() as session:
-            async with session.request(
-                method, url, headers=headers, json=json
+
+        async def send() -> MaybeJson:
+            async with self.session.request(
+                method,
+                url,
+                headers=headers,
+                json=json,
+                timeout=pool.timeout_within(remaining()),
             ) as response:
+                if response.status >= 400:
+                    raise ApiError(
+                        response.status,
+                        (await response.text())[:500],
+                        url,
+                        retry_after(response.headers.get("Retry-After")),
+                    )
                 try:
-                    data = await response.json()
-                    return data
-                except (
-                    FaunaException,
-                    ValueError,
-                    KeyError,
-                    TypeError,
-                    Exception,
-                ) as exc:  # pylint:disable=broad-exception-caught, unused-variable
-                    return None
+                    return await response.json(content_type=None)
+                except ValueError as exc:
+                    raise ApiError(
+                        response.status, f"Invalid JSON response: {exc}", url
+                    ) from exc
+
+        return await scheduler.run(url, send, tokens)
 
     async def text(
         self,
@@ -148,21 +178,56 @@ class ApiClient(LazyProxy[ClientSession]):
             headers = {**self.headers, **headers}
         elif self.headers is not None:
             headers = self.headers
-        async with self.__load__() as session:
-            async with session.request(
-                method, url, headers=headers, json=json
-            ) as response:
-                try:
-                    data = await response.text()
-                    return data
-                except (
-                    FaunaException,
-                    ValueError,
-                    KeyError,
-                    TypeError,
-                    Exception,
-                ) as exc:  # pylint:disable=broad-exception-caught, unused-variable
-                    return None  # type: ignore
+        async with self.session.request(
+            method, url, headers=headers, json=json
+        ) as response:
+            try:
+                data = await response.text()
+                return data
+            except (
+                FaunaException,
+                ValueError,
+                KeyError,
+                TypeError,
+                Exception,
+            ) as exc:  # pylint:disable=broad-exception-caught, unused-variable
+                return None  # type: ignore
+
+    async def events(
+        self,
+        url: str,
+        method: Method = "GET",
+        headers: MaybeHeaders = None,
+        json: MaybeJson = None,
+        tokens: float = 0,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Yields the raw payloads of a server-sent event stream. The request waits
+        for the host's rate limits but is not retried.
+        """
+        if self.base_url is not None:
+            url = self.base_url + url
+        if self.headers is not None and headers is not None:
+            headers = {**self.headers, **headers}
+        elif self.headers is not None:
+            headers = self.headers
+        await scheduler.acquire(url, tokens)
+        async with self.session.request(
+            method, url, headers=headers, json=json, timeout=pool.stream_timeout
+        ) as response:
+            if response.status >= 400:
+                raise ApiError(
+                    response.status,
+                    (await response.text())[:500],
+                    url,
+                    retry_after(response.headers.get("Retry-After")),
+                )
+            parser = EventStreamParser()
+            async for chunk in response.content.iter_any():
+                for payload in parser.feed(chunk):
+                    yield payload
+            for payload in parser.close():
+                yield payload
 
     async def stream(
         self,
@@ -177,19 +242,22 @@ class ApiClient(LazyProxy[ClientSession]):
             headers = {**self.headers, **headers}
         elif self.headers is not None:
             headers = self.headers
-        async with self.__load__() as session:
-            async with session.request(
-                method, url, headers=headers, json=json
-            ) as response:
-                async for chunk in response.content.iter_chunked(1024):
-                    try:
-                        yield chunk.decode()
-                    except (
-                        FaunaException,
-                        ValueError,
-                        KeyError,
-                        TypeError,
-                        Exception,
-                    ) as exc:
-                        print(exc)  # pylint:disable=broad-exception-caught
-                        yield base64.b64encode(chunk).decode()
+        async with self.session.request(
+            method, url, headers=headers, json=json, timeout=pool.stream_timeout
+        ) as response:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            async for chunk in response.content.iter_chunked(1024):
+                try:
+                    text = decoder.decode(chunk)
+                    if text:
+                        yield text
+                except (
+                    FaunaException,
+                    ValueError,
+                    KeyError,
+                    TypeError,
+                    Exception,
+                ) as exc:
+                    print(exc)  # pylint:disable=broad-exception-caught
+                    decoder.reset()
+                    yield base64.b64encode(chunk).decode()
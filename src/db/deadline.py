@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import Iterator, Optional
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the work of a deadline scope can't finish in time."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Bounds the outbound calls made in this context, including calls made by tasks
+    it spawns, to `seconds` from now. Nested scopes can only shorten the deadline.
+    """
+    at = monotonic() + seconds
+    current = _deadline.get()
+    if current is not None and current < at:
+        at = current
+    token = _deadline.set(at)
+    try:
+        yield at
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one."""
+    at = _deadline.get()
+    return None if at is None else at - monotonic()
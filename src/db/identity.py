@@ -0,0 +1,71 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+Key = Tuple[str, ...]
+
+_current: ContextVar[Optional["IdentityMap"]] = ContextVar(
+    "identity_map", default=None
+)
+
+
+class IdentityMap:
+    """
+    Request-scoped cache of loaded documents.
+
+    Concurrent loads of the same key share one in-flight query, and repeat
+    reads are served from memory until the model is written to. Missing
+    documents are not cached.
+    """
+
+    def __init__(self):
+        self._loads: Dict[Key, "asyncio.Future[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def current() -> Optional["IdentityMap"]:
+        return _current.get()
+
+    async def load(self, key: Key, loader: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._loads.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(loader())
+            self._loads[key] = future
+        else:
+            self.hits += 1
+        try:
+            result = await asyncio.shield(future)
+        except Exception:
+            self._forget(key, future)
+            raise
+        if result is None:
+            self._forget(key, future)
+        return result
+
+    def put(self, key: Key, value: Any):
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(value)
+        self._loads[key] = future
+
+    def invalidate(self, model: str):
+        """Drops every cached load of `model`."""
+        for key in [key for key in self._loads if key[0] == model]:
+            del self._loads[key]
+
+    def _forget(self, key: Key, future: "asyncio.Future[Any]"):
+        if self._loads.get(key) is future:
+            del self._loads[key]
+
+
+@contextmanager
+def identity_map() -> Iterator[IdentityMap]:
+    """Scopes an identity map to the current context, e.g. one request."""
+    scope = IdentityMap()
+    token = _current.set(scope)
+    try:
+        yield scope
+    finally:
+        _current.reset(token)
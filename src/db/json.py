@@ -15,6 +15,11 @@ from typing_extensions import override
 from .objects import FaunaTime, Native, Query, Ref, SetRef
 from .query import Expr
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 T = TypeVar("T")
 
 FaunaKey = Literal[
@@ -27,7 +32,10 @@ def _parse_json_hook(dct: Dict[FaunaKey, Any]):
         ref = dct["@ref"]
         if not "collection" in ref and not "database" in ref:
             return Native.from_name(ref["id"])
-        return Ref(ref["id"], ref.get("collection"), ref.get("database"))
+        collection = ref.get("collection")
+        if isinstance(collection, Ref) and collection.collection() is None:
+            return Ref.interned(ref["id"], collection, ref.get("database"))
+        return Ref(ref["id"], collection, ref.get("database"))
     if "@obj" in dct:
         return dct["@obj"]
     if "@set" in dct:
@@ -50,6 +58,33 @@ def parse_json(json_string):
         pass
 
 
+def loads_bytes(body: bytes) -> Any:
+    """Parses a response body without decoding Fauna special types."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return loads(body)
+
+
+def decode(value):
+    """
+    Decodes the Fauna special types (`@ref`, `@ts`, ...) inside an already
+    parsed value, like `parse_json` does for a whole document.
+
+    Containers are decoded in place rather than copied, so `value` must be
+    freshly parsed and not shared.
+    """
+    if isinstance(value, dict):
+        for key, val in value.items():
+            if isinstance(val, (dict, list)):
+                value[key] = decode(val)
+        return _parse_json_hook(value)
+    if isinstance(value, list):
+        for index, val in enumerate(value):
+            if isinstance(val, (dict, list)):
+                value[index] = decode(val)
+    return value
+
+
 def to_json(dct, pretty=True, sort_keys=True):
     if pretty:
         return dumps(
@@ -71,37 +106,69 @@ def to_json(dct, pretty=True, sort_keys=True):
     )
 
 
+def _default(obj):
+    if isinstance(obj, Expr):
+        return obj.to_fauna_json()
+    elif isinstance(obj, datetime):
+        return obj.astimezone().isoformat()
+    elif isinstance(obj, date):
+        return {"@date": obj.isoformat()}
+    elif isinstance(obj, (bytes, bytearray)):
+        _val = None
+        try:
+            _val = obj.decode()
+        except:
+            _val = urlsafe_b64encode(obj).decode()  # pylint: disable=all
+        return {"@bytes": _val}
+    elif isinstance(obj, BaseModel):
+        return obj.dict()
+    elif isinstance(obj, Enum):
+        return obj.value
+    elif isinstance(obj, UUID):
+        return {"@uuid": str(obj)}
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
 class FaunaJSONEncoder(JSONEncoder):
     @override
     def default(self, obj):
-        if isinstance(obj, (Ref, SetRef, FaunaTime, Query)):
-            return obj.to_fauna_json()
-        if isinstance(obj, Expr):
-            return obj.to_fauna_json()
-        elif isinstance(obj, datetime):
-            return obj.astimezone().isoformat()
-        elif isinstance(obj, date):
-            return {"@date": obj.isoformat()}
-        elif isinstance(obj, (bytes, bytearray)):
-            _val = None
-            try:
-                _val = obj.decode()
-            except:
-                _val = urlsafe_b64encode(obj).decode()  # pylint: disable=all
-            return {"@bytes": _val}
-        elif isinstance(obj, BaseModel):
-            return obj.dict()
-        elif isinstance(obj, Enum):
-            return obj.value
-        elif isinstance(obj, UUID):
-            return {"@uuid": str(obj)}
-        else:
-            return super().default(obj)
+        return _default(obj)
+
+
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+
+
+def to_plain(obj):
+    """
+    Converts an `Expr`/`Ref`/`FaunaTime` tree into plain dicts and lists in a
+    single pass, so it can be dumped without a Python-level `default` hook.
+    """
+    cls = obj.__class__
+    if cls in _SCALARS:
+        return obj
+    if cls is dict:
+        return {key: to_plain(val) for key, val in obj.items()}
+    if cls is list or cls is tuple:
+        return [to_plain(val) for val in obj]
+    if cls is Expr:
+        return to_plain(obj.value)
+    if isinstance(obj, (str, int, float)) and not isinstance(obj, Enum):
+        return obj
+    return to_plain(_default(obj))
+
+
+def to_wire(expr) -> bytes:
+    """Compact, unsorted UTF-8 encoding of a query, as sent to Fauna."""
+    if orjson is not None:
+        return orjson.dumps(to_plain(expr))
+    return dumps(
+        to_plain(expr), separators=(",", ":"), ensure_ascii=False, allow_nan=False
+    ).encode()
 
 
 class JSONModel(BaseModel):
     def to_dict(self, **kwargs):
-        return parse_json(self.to_json(**kwargs))
+        return parse_json(to_json(super().dict(**kwargs), pretty=False))
 
     def to_json(self, **kwargs) -> str:
         return to_json(super().dict(**kwargs))
@@ -8,6 +8,8 @@ from iso8601 import parse_date
 
 from .query import Expr
 
+_interned = {}
+
 
 class Ref(Expr):
     """
@@ -28,6 +30,8 @@ class Ref(Expr):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, id, cls=None, db=None):
         if id is None:
             raise ValueError("The Ref must have an id.")
@@ -42,6 +46,18 @@ class Ref(Expr):
 
         super(Ref, self).__init__(value)
 
+    @classmethod
+    def interned(cls, id, collection=None, database=None):
+        """
+        Returns a shared Ref. Meant for schema refs (collections, indexes, ...),
+        which are few and repeated across every response.
+        """
+        key = (id, collection, database)
+        ref = _interned.get(key)
+        if ref is None:
+            ref = _interned[key] = cls(id, collection, database)
+        return ref
+
     def collection(self):
         """
         Gets the collection part out of the Ref.
@@ -89,13 +105,6 @@ class Ref(Expr):
         )
         return "Ref(id=%s%s%s)" % (self.value["id"], col, db)
 
-    def __eq__(self, other):
-        return isinstance(other, Ref) and self.value == other.value
-
-    def __ne__(self, other):
-        # pylint: disable=unneeded-not
-        return not self == other
-
 
 class Native(object):
     COLLECTIONS = Ref("collections")
@@ -113,7 +122,7 @@ class Native(object):
 
     @classmethod
     def from_name(cls, name):
-        return getattr(cls, name.upper(), Ref(name))
+        return getattr(cls, name.upper(), None) or Ref.interned(name)
 
 
 class SetRef(Expr):
@@ -123,6 +132,8 @@ class SetRef(Expr):
     For query sets see :doc:`query`.
     """
 
+    __slots__ = ()
+
     def __init__(self, set_ref):
         if isinstance(set_ref, Expr):
             value = set_ref.value
@@ -137,13 +148,6 @@ class SetRef(Expr):
     def __repr__(self):
         return f"SetRef({repr(self.value)})"
 
-    def __eq__(self, other):
-        return isinstance(other, SetRef) and self.value == other.value
-
-    def __ne__(self, other):
-        # pylint: disable=unneeded-not
-        return not self == other
-
 
 class FaunaTime(Expr):
     """
@@ -152,6 +156,8 @@ class FaunaTime(Expr):
     For dates, regular :class:`datetime.date` objects are used.
     """
 
+    __slots__ = ()
+
     def __init__(self, value):
         """
         :param value:
@@ -180,13 +186,6 @@ class FaunaTime(Expr):
     def __repr__(self):
         return "FaunaTime(%s)" % repr(self.value)
 
-    def __eq__(self, other):
-        return isinstance(other, FaunaTime) and self.value == other.value
-
-    def __ne__(self, other):
-        # pylint: disable=unneeded-not
-        return not self == other
-
 
 class Query(Expr):
     """
@@ -194,15 +193,10 @@ class Query(Expr):
     See the `docs <https://app.fauna.com/documentation/reference/queryapi#special-type>`__.
     """
 
+    __slots__ = ()
+
     def to_fauna_json(self):
         return {"@query": self.value}
 
     def __repr__(self):
         return "Query(%s)" % repr(self.value)
-
-    def __eq__(self, other):
-        return isinstance(other, Query) and self.value == other.value
-
-    def __ne__(self, other):
-        # pylint: disable=unneeded-not
-        return not self == other
@@ -1,10 +1,24 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
 import os
-from collections import defaultdict
-from typing import Any, List, Optional, Type, TypeVar
+from contextlib import contextmanager
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 from pydantic.main import ModelMetaclass
 
@@ -17,9 +31,14 @@ except ImportError:
 from dotenv import load_dotenv
 from pydantic import BaseModel  # pylint: disable=no-name-in-module
 
+from .cache import ModelCache, clear_model_cache
 from .client import FaunaClient
 from .errors import FaunaException
-from .json import JSONModel
+from .identity import IdentityMap
+from .json import JSONModel, decode
+from .page import Page
+from .subscription import Subscription
+from .template import QueryTemplate, param
 
 load_dotenv()
 
@@ -34,6 +53,62 @@ ModelTypeList = List[ModelType]
 ModelList = List[T]
 
 
+SCHEMA_MANIFEST = "schema_manifest"
+
+_templates: Dict[Tuple[str, str], QueryTemplate] = {}
+
+
+def schema_fingerprint(models: List[Type[FaunaModel]]) -> str:
+    """Hashes the model names, fields and index/unique flags that provisioning depends on."""
+    schema = sorted(
+        [
+            model.__name__.lower(),
+            sorted(
+                [
+                    field.name,
+                    bool(field.field_info.extra.get("index")),
+                    bool(field.field_info.extra.get("unique")),
+                ]
+                for field in model.__fields__.values()
+            ),
+        ]
+        for model in models
+    )
+    return hashlib.sha256(
+        json.dumps(schema, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def _manifest_path() -> str:
+    return os.getenv("FAUNA_SCHEMA_MANIFEST", "/tmp/fauna_schema.json")
+
+
+def _read_local_manifest() -> Optional[str]:
+    try:
+        with open(_manifest_path(), encoding="utf-8") as file:
+            return json.load(file).get("fingerprint")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _write_local_manifest(fingerprint: str):
+    try:
+        with open(_manifest_path(), "w", encoding="utf-8") as file:
+            json.dump({"fingerprint": fingerprint}, file)
+    except OSError as exc:
+        logging.warning("Could not write schema manifest: %s", exc)
+
+
+def _create_collection(name: str) -> Any:
+    return q.if_(
+        q.exists(q.collection(name)), None, q.create_collection({"name": name})
+    )
+
+
+def _create_index(params: Dict[str, Any]) -> Any:
+    return q.if_(q.exists(q.index(params["name"])), None, q.create_index(params))
+
+
 class FaunaModelMetaclass(ModelMetaclass):
     def __new__(cls, name, bases, namespace, **kwargs):
         new_cls = super().__new__(cls, name, bases, namespace, **kwargs)
@@ -64,11 +139,127 @@ class FaunaModel(JSONModel, metaclass=FaunaModelMetaclass):
                 continue
 
     @classmethod
-    async def create_all(cls):
-        await asyncio.gather(
-            *[model.provision() for model in cls.Metadata.__subclasses__]
+    def _from_data(cls: Type[T], data: Dict[str, Any]) -> T:
+        """
+        Hydrates a raw document in place: special types are decoded only in the
+        nested values of its data, and scalars are passed through untouched.
+
+        Decoding happens here rather than on field access because pydantic
+        validates every field when the model is built, and an undecoded `@ts`
+        or `@ref` wouldn't validate as the field's type.
+        """
+        fields = data["data"]
+
+        for key, value in fields.items():
+            if isinstance(value, (dict, list)):
+                fields[key] = decode(value)
+
+        fields["ref"] = data["ref"]["@ref"]["id"]
+        fields["ts"] = data["ts"] / 1000
+        return cls(**fields)
+
+    @classmethod
+    async def create_all(cls) -> bool:
+        """
+        Provisions every model, skipping all work when the schema fingerprint
+        matches the one recorded by the last successful run.
+        """
+        models = cls.Metadata.__subclasses__
+        fingerprint = schema_fingerprint(models)
+
+        if _read_local_manifest() == fingerprint:
+            return True
+
+        _q = cls.q()
+        recorded = await _q(
+            q.if_(
+                q.exists(q.collection(SCHEMA_MANIFEST)),
+                q.select(
+                    ["data", "fingerprint"], q.get(q.collection(SCHEMA_MANIFEST)), None
+                ),
+                None,
+            )
         )
 
+        if recorded != fingerprint:
+            collections = [_create_collection(SCHEMA_MANIFEST)]
+            indexes = []
+
+            for model in models:
+                model_collections, model_indexes = model._schema()
+                collections.extend(model_collections)
+                indexes.extend(model_indexes)
+
+            # Indexes can't be built in the transaction that creates their source
+            # collection, so collections and indexes go in two batched queries.
+            if await _q(q.do(*collections, True)) is None:
+                logging.error("Creating collections failed")
+                return False
+
+            if (
+                await _q(
+                    q.do(
+                        *indexes,
+                        q.update(
+                            q.collection(SCHEMA_MANIFEST),
+                            {"data": {"fingerprint": fingerprint}},
+                        ),
+                    )
+                )
+                is None
+            ):
+                logging.error("Creating indexes failed")
+                return False
+
+            logging.info("Provisioned schema %s", fingerprint)
+
+        _write_local_manifest(fingerprint)
+        return True
+
+    @classmethod
+    def _schema(cls) -> Tuple[List[Any], List[Any]]:
+        """Returns the queries creating this model's collection and indexes when missing."""
+        name = cls.__name__.lower()
+        collections = [_create_collection(name)]
+        indexes = [_create_index({"name": name, "source": q.collection(name)})]
+
+        for field in cls.__fields__.values():
+            if field.field_info.extra.get("unique"):
+                indexes.append(
+                    _create_index(
+                        {
+                            "name": f"{name}_{field.name}_unique",
+                            "source": q.collection(name),
+                            "terms": [{"field": ["data", field.name]}],
+                            "unique": True,
+                        }
+                    )
+                )
+
+            elif field.field_info.extra.get("index"):
+                indexes.append(
+                    _create_index(
+                        {
+                            "name": f"{name}_{field.name}",
+                            "source": q.collection(name),
+                            "terms": [{"field": ["data", field.name]}],
+                        }
+                    )
+                )
+
+        return collections, indexes
+
+    @classmethod
+    def _template(cls, name: str, build: Callable[[], Any]) -> QueryTemplate:
+        """Returns the model's template `name`, built by `build` on first use."""
+        key = (cls.__name__.lower(), name)
+        template = _templates.get(key)
+
+        if template is None:
+            template = _templates[key] = QueryTemplate(build())
+
+        return template
+
     @classmethod
     def client(cls) -> FaunaClient:
         fauna_secret = os.getenv("FAUNA_SECRET")
@@ -80,88 +271,96 @@ class FaunaModel(JSONModel, metaclass=FaunaModelMetaclass):
 
     @classmethod
     async def provision(cls) -> bool:
+        """Creates this model's missing collection and indexes in two round trips."""
         _q = cls.q()
+        collections, indexes = cls._schema()
+
+        for queries in (collections, indexes):
+            if await _q(q.do(*queries, True)) is None:
+                logging.error("Provisioning %s failed", cls.__name__.lower())
+                return False
+
+        return True
+
+    @classmethod
+    def _invalidate(cls):
+        scope = IdentityMap.current()
+
+        if scope is not None:
+            scope.invalidate(cls.__name__.lower())
+
+        clear_model_cache(cls.__name__.lower())
+
+    @classmethod
+    @contextmanager
+    def _writing(cls) -> Iterator[None]:
+        """
+        Invalidates the model's cached reads around a write: before it, and again
+        once it returns, so a read that ran while the write was in flight can't
+        keep the old document cached.
+        """
+        cls._invalidate()
 
         try:
-            if not await _q(q.exists(q.collection(cls.__name__.lower()))):
-                await _q(q.create_collection({"name": cls.__name__.lower()}))
+            yield
 
-                logging.info("Created collection %s", cls.__name__.lower())
+        finally:
+            cls._invalidate()
 
-            if not await _q(q.exists(q.index(cls.__name__.lower()))):
-                await _q(
-                    q.create_index(
-                        {
-                            "name": cls.__name__.lower(),
-                            "source": q.collection(cls.__name__.lower()),
-                        }
-                    )
-                )
+    @classmethod
+    async def _load(
+        cls, key: Tuple[str, ...], loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Serves a read from the model's process cache, then the request's identity
+        map, before running `loader`. Missing and empty results are not cached.
+        """
+        cache = ModelCache.for_model(cls)
+        generation = None
 
-                logging.info("Created index %s", cls.__name__.lower())
-
-            for field in cls.__fields__.values():
-                if field.field_info.extra.get("unique"):
-                    if not await _q(
-                        q.exists(q.index(f"{cls.__name__.lower()}_{field.name}_unique"))
-                    ):
-                        await _q(
-                            q.create_index(
-                                {
-                                    "name": f"{cls.__name__.lower()}_{field.name}_unique",
-                                    "source": q.collection(cls.__name__.lower()),
-                                    "terms": [{"field": ["data", field.name]}],
-                                    "unique": True,
-                                }
-                            )
-                        )
+        if cache is not None:
+            cached = cache.get(key)
 
-                        logging.info(
-                            "Created unique index %s_%s",
-                            cls.__name__.lower(),
-                            field.name,
-                        )
-                    continue
-
-                if field.field_info.extra.get("index"):
-                    if not await _q(
-                        q.exists(q.index(f"{cls.__name__.lower()}_{field.name}"))
-                    ):
-                        await _q(
-                            q.create_index(
-                                {
-                                    "name": f"{cls.__name__.lower()}_{field.name}",
-                                    "source": q.collection(cls.__name__.lower()),
-                                    "terms": [{"field": ["data", field.name]}],
-                                }
-                            )
-                        )
+            if cached is not None:
+                return cached
 
-                        logging.info(
-                            "Created index %s_%s", cls.__name__.lower(), field.name
-                        )
-                        continue
+            generation = cache.generation
 
-            return True
+        scope = IdentityMap.current()
 
-        except (FaunaException, KeyError, TypeError) as exc:
-            logging.error(exc)
+        if scope is None:
+            value = await loader()
 
-            return False
+        else:
+            value = await scope.load((cls.__name__.lower(), *key), loader)
+
+        if cache is not None and value:
+            # Skipped if a write invalidated the model while this read ran.
+            cache.set(key, value, generation)
+
+        return value
 
     @classmethod
     async def find_unique(cls: Type[T], field: str, value: Any) -> Optional[T]:
+        return await cls._load(
+            ("unique", field, repr(value)), lambda: cls._find_unique(field, value)
+        )
+
+    @classmethod
+    async def _find_unique(cls: Type[T], field: str, value: Any) -> Optional[T]:
         try:
             data = await cls.q()(
-                q.get(q.match(q.index(f"{cls.__name__.lower()}_{field}_unique"), value))
-            )
-            return cls(
-                **{
-                    **data["data"],  # type: ignore
-                    "ref": data["ref"]["@ref"]["id"],  # type: ignore
-                    "ts": data["ts"] / 1000,  # type: ignore
-                }
+                cls._template(
+                    f"find_unique:{field}",
+                    lambda: q.get(
+                        q.match(
+                            q.index(f"{cls.__name__.lower()}_{field}_unique"),
+                            param("value"),
+                        )
+                    ),
+                ).render(value=value)
             )
+            return cls._from_data(data)  # type: ignore
 
         except (FaunaException, KeyError, TypeError) as exc:
             logging.error(exc)
@@ -169,44 +368,18 @@ class FaunaModel(JSONModel, metaclass=FaunaModelMetaclass):
 
     @classmethod
     async def find_many(cls: Type[T], field: str, value: Any) -> List[T]:
-        try:
-            _q = cls.q()
-
-            refs = (
-                await _q(
-                    q.paginate(
-                        q.match(q.index(f"{cls.__name__.lower()}_{field}"), value)
-                    )
-                )
-            )[
-                "data"
-            ]  # type: ignore
-
-            collection_refs_map = defaultdict(list)
-
-            for ref in refs:
-                collection = q.collection(cls.__name__.lower())
-
-                collection_refs_map[collection].append(
-                    q.ref(collection, ref["@ref"]["id"])  # type: ignore
-                )
-
-            data = await asyncio.gather(
-                *[
-                    _q(q.get(q.paginate(collection_refs)))
-                    for _, collection_refs in collection_refs_map.items()
-                ]
-            )
-
-            flattened_data = [
-                item for collection_data in data for item in collection_data["data"]
-            ]
+        return await cls._load(
+            ("many", field, repr(value)), lambda: cls._find_many(field, value)
+        )
 
+    @classmethod
+    async def _find_many(cls: Type[T], field: str, value: Any) -> List[T]:
+        try:
             return [
-                cls(
-                    **{**d["data"], "ref": d["ref"]["@ref"]["id"], "ts": d["ts"] / 1000}
+                instance
+                async for instance in cls._iter_set(
+                    q.match(q.index(f"{cls.__name__.lower()}_{field}"), value)
                 )
-                for d in flattened_data
             ]
 
         except (FaunaException, KeyError, TypeError) as exc:
@@ -216,15 +389,20 @@ class FaunaModel(JSONModel, metaclass=FaunaModelMetaclass):
 
     @classmethod
     async def get(cls: Type[T], ref: str) -> Optional[T]:
+        return await cls._load(("ref", ref), lambda: cls._get(ref))
+
+    @classmethod
+    async def _get(cls: Type[T], ref: str) -> Optional[T]:
         try:
-            data = await cls.q()(q.get(q.ref(q.collection(cls.__name__.lower()), ref)))
-            return cls(
-                **{
-                    **data["data"],  # type: ignore
-                    "ref": data["ref"]["@ref"]["id"],  # type: ignore
-                    "ts": data["ts"] / 1000,  # type: ignore
-                }
+            data = await cls.q()(
+                cls._template(
+                    "get",
+                    lambda: q.get(
+                        q.ref(q.collection(cls.__name__.lower()), param("ref"))
+                    ),
+                ).render(ref=ref)
             )
+            return cls._from_data(data)  # type: ignore
 
         except (FaunaException, KeyError, TypeError) as exc:
             logging.error(exc)
@@ -232,30 +410,12 @@ class FaunaModel(JSONModel, metaclass=FaunaModelMetaclass):
 
     @classmethod
     async def all(cls: Type[T]) -> List[T]:
-        try:
-            _q = cls.q()
-
-            query = q.paginate(q.match(q.index(f"{cls.__name__.lower()}")))
+        return await cls._load(("all",), cls._all)
 
-            refs = (await _q(query))["data"]  # type: ignore
-
-            data = await asyncio.gather(
-                *[
-                    _q(
-                        q.get(
-                            q.ref(q.collection(cls.__name__.lower()), ref["@ref"]["id"])
-                        )
-                    )
-                    for ref in refs
-                ]
-            )
-
-            return [
-                cls(
-                    **{**d["data"], "ref": d["ref"]["@ref"]["id"], "ts": d["ts"] / 1000}
-                )
-                for d in data
-            ]
+    @classmethod
+    async def _all(cls: Type[T]) -> List[T]:
+        try:
+            return [instance async for instance in cls.iter_all()]
 
         except (FaunaException, KeyError, TypeError) as exc:
             logging.error(exc)
@@ -263,15 +423,68 @@ class FaunaModel(JSONModel, metaclass=FaunaModelMetaclass):
             return []
 
     @classmethod
-    async def delete_one(cls, field: str, value: Any) -> bool:
-        try:
-            _q = cls.q()
+    async def _iter_set(
+        cls: Type[T], set_query: Any, page_size: int = 64, prefetch: int = 1
+    ) -> AsyncGenerator[T, None]:
+        """Pages through a set of refs, fetching each page's documents in the same query."""
+        async for instance in Page.set_iterator(
+            cls.client(),
+            set_query,
+            map_lambda=q.lambda_("ref", q.get(q.var("ref"))),
+            mapper=cls._from_data,
+            page_size=page_size,
+            prefetch=prefetch,
+        ):
+            yield instance
 
-            ref = await _q(
-                q.get(q.match(q.index(f"{cls.__name__.lower()}_{field}_unique"), value))
-            )
+    @classmethod
+    async def iter_all(
+        cls: Type[T], page_size: int = 64, prefetch: int = 1
+    ) -> AsyncGenerator[T, None]:
+        """
+        Yields every document of the collection, one page of `page_size` at a time,
+        while up to `prefetch` pages are fetched ahead in the background.
+        """
+        async for instance in cls._iter_set(
+            q.match(q.index(f"{cls.__name__.lower()}")), page_size, prefetch
+        ):
+            yield instance
 
-            await _q(q.delete(ref))
+    @classmethod
+    def subscribe(cls, ref: Optional[str] = None) -> AsyncGenerator[Any, None]:
+        """
+        Follows the change events of one document, or of the whole collection when
+        `ref` is None. Listeners of the same target share one upstream stream.
+        """
+        target = (
+            q.documents(q.collection(cls.__name__.lower()))
+            if ref is None
+            else q.ref(q.collection(cls.__name__.lower()), ref)
+        )
+        return Subscription.of(cls.client(), target).listen()
+
+    @classmethod
+    async def delete_one(cls, field: str, value: Any) -> bool:
+        try:
+            with cls._writing():
+                await cls.q()(
+                    cls._template(
+                        f"delete_one:{field}",
+                        lambda: q.delete(
+                            q.select(
+                                "ref",
+                                q.get(
+                                    q.match(
+                                        q.index(
+                                            f"{cls.__name__.lower()}_{field}_unique"
+                                        ),
+                                        param("value"),
+                                    )
+                                ),
+                            )
+                        ),
+                    ).render(value=value)
+                )
 
             return True
 
@@ -283,7 +496,15 @@ class FaunaModel(JSONModel, metaclass=FaunaModelMetaclass):
     @classmethod
     async def delete(cls, ref: str) -> bool:
         try:
-            await cls.q()(q.delete(q.ref(q.collection(cls.__name__.lower()), ref)))
+            with cls._writing():
+                await cls.q()(
+                    cls._template(
+                        "delete",
+                        lambda: q.delete(
+                            q.ref(q.collection(cls.__name__.lower()), param("ref"))
+                        ),
+                    ).render(ref=ref)
+                )
 
             return True
 
@@ -292,30 +513,181 @@ class FaunaModel(JSONModel, metaclass=FaunaModelMetaclass):
 
             return False
 
-    async def create(self: T) -> Optional[T]:
-        try:
-            for field in self.__fields__.values():
-                if field.field_info.extra.get("unique"):
-                    instance = await self.find_unique(
-                        field.name, self.__dict__[field.name]
-                    )
+    @classmethod
+    def _unique_fields(cls) -> List[str]:
+        return [
+            field.name
+            for field in cls.__fields__.values()
+            if field.field_info.extra.get("unique")
+        ]
 
-                    if instance is None:
-                        continue
+    @classmethod
+    def _create_query(
+        cls,
+        data: Any,
+        value: Callable[[str], Any],
+        found: Callable[[Any], Any] = lambda document: document,
+    ) -> Any:
+        """
+        Builds a create of `data` that returns the existing document instead when
+        one already holds a unique value, checking unique fields in declaration order.
+        `value(field)` gives the expression for the new document's value of `field`,
+        and `found(document)` what to return for an existing document.
+        """
+        query = q.create(q.collection(cls.__name__.lower()), {"data": data})
+        for field in reversed(cls._unique_fields()):
+            match = q.match(
+                q.index(f"{cls.__name__.lower()}_{field}_unique"), value(field)
+            )
+            query = q.if_(q.exists(match), found(q.get(match)), query)
+        return query
 
-                    if issubclass(instance.__class__, FaunaModel):
-                        return instance
+    @classmethod
+    async def _write_batches(
+        cls,
+        items: List[Any],
+        build: Callable[[List[Any]], Any],
+        parse: Callable[[Any], Any],
+        batch_size: int,
+        concurrency: int,
+    ) -> List[Any]:
+        """
+        Sends `build(batch)` as one transaction per batch of `items` and maps each
+        result with `parse`. Every item of a failed batch maps to None.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def write(batch: List[Any]) -> List[Any]:
+            async with semaphore:
+                data = await cls.q()(build(batch))
+            try:
+                if data is None or len(data) != len(batch):
+                    raise FaunaException(500, "Batch write failed", None)
+                return [parse(item) for item in data]
+            except (FaunaException, KeyError, TypeError, ValueError) as exc:
+                logging.error(
+                    "Writing %s %s documents failed: %s", len(batch), cls.__name__, exc
+                )
+                return [None] * len(batch)
+
+        with cls._writing():
+            results = await asyncio.gather(
+                *[
+                    write(items[start : start + batch_size])
+                    for start in range(0, len(items), batch_size)
+                ]
+            )
+        return [result for batch in results for result in batch]
 
+    @classmethod
+    async def create_many(
+        cls: Type[T], instances: List[T], batch_size: int = 100, concurrency: int = 4
+    ) -> List[Optional[T]]:
+        """
+        Creates `instances` with one transaction per `batch_size` documents.
+        Returns the created documents in input order, or the existing document
+        for an instance whose unique value is taken, and None where a batch failed.
+        """
+        return await cls._write_batches(
+            [instance.dict(exclude={"ref", "ts"}) for instance in instances],
+            lambda batch: q.map_(
+                q.lambda_(
+                    "data",
+                    cls._create_query(
+                        q.var("data"), lambda field: q.select(field, q.var("data"))
+                    ),
+                ),
+                batch,
+            ),
+            cls._from_data,
+            batch_size,
+            concurrency,
+        )
+
+    @classmethod
+    async def update_many(
+        cls: Type[T],
+        updates: List[Tuple[str, Dict[str, Any]]],
+        batch_size: int = 100,
+        concurrency: int = 4,
+    ) -> List[Optional[T]]:
+        """
+        Applies `(ref, fields)` updates with one transaction per `batch_size` documents.
+        Returns the updated documents in input order, None where a batch failed.
+        """
+        return await cls._write_batches(
+            [[ref, fields] for ref, fields in updates],
+            lambda batch: q.map_(
+                q.lambda_(
+                    ["ref", "data"],
+                    q.update(
+                        q.ref(q.collection(cls.__name__.lower()), q.var("ref")),
+                        {"data": q.var("data")},
+                    ),
+                ),
+                batch,
+            ),
+            cls._from_data,
+            batch_size,
+            concurrency,
+        )
+
+    @classmethod
+    async def delete_many(
+        cls, refs: List[str], batch_size: int = 100, concurrency: int = 4
+    ) -> List[bool]:
+        """
+        Deletes `refs` with one transaction per `batch_size` documents.
+        Returns whether each ref was deleted, in input order.
+        """
+        results = await cls._write_batches(
+            refs,
+            lambda batch: q.foreach(
+                q.lambda_(
+                    "ref",
+                    q.delete(q.ref(q.collection(cls.__name__.lower()), q.var("ref"))),
+                ),
+                batch,
+            ),
+            lambda _: True,
+            batch_size,
+            concurrency,
+        )
+        return [result is True for result in results]
+
+    async def create(self: T) -> Optional[T]:
+        """
+        Creates the document, or returns the one already holding any of its unique
+        values, in a single round trip. `ref` and `ts` are only set on `self` when
+        its own document was created.
+        """
+        try:
             data = await self.__class__.q()(
-                q.create(
-                    q.collection(self.__class__.__name__.lower()), {"data": self.dict()}
+                self._create_query(
+                    self.dict(),
+                    self.__dict__.__getitem__,
+                    lambda document: q.merge(document, {"existing": True}),
                 )
             )
 
+            if data is None:
+                # A concurrent create won the unique index: return its document.
+                for field in self._unique_fields():
+                    instance = await self.find_unique(field, self.__dict__[field])
+
+                    if instance is not None:
+                        return instance
+
+                return None
+
+            if data.pop("existing", False):
+                return self.__class__._from_data(data)  # type: ignore
+
+            self._invalidate()
             self.ref = data["ref"]["@ref"]["id"]  # type: ignore
 
             self.ts = data["ts"] / 1000  # type: ignore
-            return self
+            return self.__class__._from_data(data)  # type: ignore
 
         except (FaunaException, KeyError, TypeError) as exc:
             logging.error(exc)
@@ -324,25 +696,17 @@ class FaunaModel(JSONModel, metaclass=FaunaModelMetaclass):
     @classmethod
     async def update(cls: Type[T], ref: str, **kwargs) -> T:
         try:
-            instance = await cls.get(ref)
-
-            if isinstance(instance, cls):
+            with cls._writing():
                 instance_updated = await cls.q()(
-                    q.update(
-                        q.ref(q.collection(cls.__name__.lower()), ref),
-                        {"data": kwargs.get("kwargs", kwargs)},
-                    )
+                    cls._template(
+                        "update",
+                        lambda: q.update(
+                            q.ref(q.collection(cls.__name__.lower()), param("ref")),
+                            {"data": param("data")},
+                        ),
+                    ).render(ref=ref, data=kwargs.get("kwargs", kwargs))
                 )
-                return cls(
-                    **{
-                        **instance_updated["data"],  # type: ignore
-                        "ref": instance_updated["ref"]["@ref"]["id"],  # type: ignore
-                        "ts": instance_updated["ts"] / 1000,  # type: ignore
-                    }
-                )
-
-            else:
-                raise ValueError(f"Field {ref} not found")
+            return cls._from_data(instance_updated)  # type: ignore
 
         except (FaunaException, KeyError, TypeError) as exc:
             logging.error(exc)
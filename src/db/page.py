@@ -1,10 +1,21 @@
+import asyncio
+
 from . import query
+from .errors import FaunaException
+from .json import decode
+
+
+def _cursor(raw):
+    """Decodes a raw cursor so its refs serialize back as `@ref` values."""
+    return None if raw is None else decode(raw)
 
 
 class Page:
     @staticmethod
     def from_raw(raw):
-        return Page(raw["data"], raw.get("before"), raw.get("after"))
+        if raw is None:
+            raise FaunaException(500, "Page query failed", None)
+        return Page(raw["data"], _cursor(raw.get("before")), _cursor(raw.get("after")))
 
     def __init__(self, data, before=None, after=None):
         self.data = data
@@ -30,20 +41,47 @@ class Page:
         )
 
     @staticmethod
-    def set_iterator(client, set_query, map_lambda=None, mapper=None, page_size=None):
-        def get_page(**kwargs):
+    async def set_iterator(
+        client, set_query, map_lambda=None, mapper=None, page_size=None, prefetch=1
+    ):
+        """
+        Walks every page of `set_query`, yielding one item at a time.
+
+        A background task keeps up to `prefetch` pages fetched ahead of the
+        consumer, so the next round trip overlaps with processing the current page.
+        """
+
+        async def get_page(**kwargs):
             queried = query.paginate(set_query, **kwargs)
             if map_lambda is not None:
                 queried = query.map_(map_lambda, queried)
-            return Page.from_raw(client.query(queried))
-
-        page = get_page(size=page_size)
-        for val in page.data:
-            yield val if mapper is None else mapper(val)
-        next_cursor = "after" if page.after is not None else "before"
-        while getattr(page, next_cursor) is not None:
-            page = get_page(
-                **{"size": page_size, next_cursor: getattr(page, next_cursor)}
-            )
-            for val in page.data:
-                yield val if mapper is None else mapper(val)
+            return Page.from_raw(await client.query(queried))
+
+        pages: asyncio.Queue = asyncio.Queue(maxsize=max(prefetch, 1))
+
+        async def produce():
+            try:
+                page = await get_page(size=page_size)
+                await pages.put(page)
+                next_cursor = "after" if page.after is not None else "before"
+                while getattr(page, next_cursor) is not None:
+                    page = await get_page(
+                        **{"size": page_size, next_cursor: getattr(page, next_cursor)}
+                    )
+                    await pages.put(page)
+                await pages.put(None)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                await pages.put(exc)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                page = await pages.get()
+                if page is None:
+                    break
+                if isinstance(page, Exception):
+                    raise page
+                for val in page.data:
+                    yield val if mapper is None else mapper(val)
+        finally:
+            producer.cancel()
@@ -0,0 +1,92 @@
+import asyncio
+import os
+from typing import Optional
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class ConnectionPool:
+    """
+    Process-wide aiohttp session shared by every client.
+
+    A single `TCPConnector` keeps a keep-alive pool per host, so OpenAI, Pinecone
+    and Fauna calls reuse warm TCP+TLS connections instead of handshaking on every
+    request. Limits are read from the environment:
+
+    HTTP_POOL_LIMIT            total open connections (default 100)
+    HTTP_POOL_LIMIT_PER_HOST   open connections per host (default 32)
+    HTTP_POOL_KEEPALIVE        idle keep-alive seconds (default 75)
+    HTTP_POOL_DNS_TTL          DNS cache seconds (default 300)
+    HTTP_TIMEOUT_TOTAL         seconds for a whole request (default 30)
+    HTTP_TIMEOUT_CONNECT       seconds to get a connection (default 5)
+    HTTP_TIMEOUT_READ          seconds between reads from the socket (default 20)
+
+    Streaming responses use `stream_timeout`, which keeps the connect and read
+    timeouts but has no total.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        ttl_dns_cache: Optional[int] = None,
+    ):
+        self.limit = limit or int(os.getenv("HTTP_POOL_LIMIT", "100"))
+        self.limit_per_host = limit_per_host or int(
+            os.getenv("HTTP_POOL_LIMIT_PER_HOST", "32")
+        )
+        self.keepalive_timeout = keepalive_timeout or float(
+            os.getenv("HTTP_POOL_KEEPALIVE", "75")
+        )
+        self.ttl_dns_cache = ttl_dns_cache or int(os.getenv("HTTP_POOL_DNS_TTL", "300"))
+        self.timeout = ClientTimeout(
+            total=float(os.getenv("HTTP_TIMEOUT_TOTAL", "30")),
+            connect=float(os.getenv("HTTP_TIMEOUT_CONNECT", "5")),
+            sock_read=float(os.getenv("HTTP_TIMEOUT_READ", "20")),
+        )
+        self.stream_timeout = ClientTimeout(
+            total=None, connect=self.timeout.connect, sock_read=self.timeout.sock_read
+        )
+        self._session: Optional[ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def session(self) -> ClientSession:
+        """Returns the shared session, creating it on first use or after close."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = ClientSession(
+                timeout=self.timeout,
+                connector=TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.ttl_dns_cache,
+                    use_dns_cache=True,
+                )
+            )
+            self._loop = loop
+        return self._session
+
+    def timeout_within(self, budget: Optional[float]) -> ClientTimeout:
+        """The default timeout, shortened to fit `budget` seconds when given."""
+        if budget is None or budget >= (self.timeout.total or budget):
+            return self.timeout
+        budget = max(budget, 0.001)
+        return ClientTimeout(
+            total=budget,
+            connect=min(self.timeout.connect or budget, budget),
+            sock_read=min(self.timeout.sock_read or budget, budget),
+        )
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+pool = ConnectionPool()
@@ -537,11 +537,25 @@ def database(db_name, scope=None):
     return _params({"database": db_name}, {"scope": scope})
 
 
+_indexes = {}
+
+
 def index(index_name, scope=None):
+    if scope is None and isinstance(index_name, str):
+        if index_name not in _indexes:
+            _indexes[index_name] = _fn({"index": index_name})
+        return _indexes[index_name]
     return _params({"index": index_name}, {"scope": scope})
 
 
+_collections = {}
+
+
 def collection(collection_name, scope=None):
+    if scope is None and isinstance(collection_name, str):
+        if collection_name not in _collections:
+            _collections[collection_name] = _fn({"collection": collection_name})
+        return _collections[collection_name]
     return _params({"collection": collection_name}, {"scope": scope})
 
 
@@ -843,9 +857,41 @@ def to_date(expr):
     return _fn({"to_date": expr})
 
 
+def _freeze(value):
+    if isinstance(value, dict):
+        return frozenset((key, _freeze(val)) for key, val in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(val) for val in value)
+    if isinstance(value, (set, bytearray)):
+        return frozenset(value) if isinstance(value, set) else bytes(value)
+    return value
+
+
+def _rebuild(cls, value):
+    expr = object.__new__(cls)
+    object.__setattr__(expr, "value", value)
+    object.__setattr__(expr, "_hash", None)
+    return expr
+
+
 class Expr:
+    """
+    Immutable query node. Nodes hash structurally over their class and value,
+    so equal expressions can be used as cache keys. The value itself must not
+    be mutated once the node is built.
+    """
+
+    __slots__ = ("value", "_hash")
+
     def __init__(self, value):
-        self.value = value
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "_hash", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
 
     def to_fauna_json(self):
         return self.value
@@ -854,7 +900,21 @@ class Expr:
         return "Expr(%s)" % repr(self.value)
 
     def __eq__(self, other):
-        return isinstance(other, Expr) and self.value == other.value
+        return type(self) is type(other) and self.value == other.value
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash((type(self), _freeze(self.value))))
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return _rebuild, (type(self), self.value)
 
 
 def _wrap(value):
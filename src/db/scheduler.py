@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import random
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from aiohttp import ClientError
+
+from .deadline import DeadlineExceeded, remaining
+
+RETRYABLE_STATUS = frozenset((408, 429, 500, 502, 503, 504))
+
+
+class ApiError(Exception):
+    """An outbound API call that failed for good, after any retries."""
+
+    def __init__(
+        self,
+        status: int,
+        message: str,
+        url: Optional[str] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(f"{status} {message}" + ("" if url is None else f" ({url})"))
+        self.status = status
+        self.message = message
+        self.url = url
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status in RETRYABLE_STATUS
+
+
+class CircuitOpenError(ApiError):
+    """Raised without calling a host whose circuit breaker is open."""
+
+
+class TokenBucket:
+    """Refills `rate` tokens per minute, holding at most one minute's worth."""
+
+    def __init__(self, rate: float):
+        self.rate = rate / 60
+        self.capacity = rate
+        self.tokens = rate
+        self.updated = monotonic()
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for `timeout`
+    seconds, then lets a single trial call through to decide whether to close.
+    """
+
+    def __init__(self, threshold: int = 5, timeout: float = 30.0):
+        self.threshold = threshold
+        self.timeout = timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if monotonic() - self.opened_at >= self.timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def release(self):
+        """Gives back a trial call that ended without an outcome, e.g. cancelled."""
+        self._trial = False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def failure(self):
+        self.failures += 1
+        self._trial = False
+        if self.failures >= self.threshold:
+            self.opened_at = monotonic()
+
+
+class Host:
+    """Rate limits, retry policy and breaker state of one upstream host."""
+
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        retries: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 20.0,
+        breaker_threshold: int = 5,
+        breaker_timeout: float = 30.0,
+    ):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_timeout)
+        self.paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Created on first use so it binds to the running event loop.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+
+def _check_deadline(wait: float = 0.0):
+    left = remaining()
+    if left is not None and left <= wait:
+        raise DeadlineExceeded(
+            f"Deadline exceeded ({left:.3f}s left, {wait:.3f}s needed)"
+        )
+
+
+class Scheduler:
+    """
+    Paces and retries outbound calls per host.
+
+    Each call waits for its host's request and token buckets, and for any pause
+    a 429 imposed. A retryable failure (timeouts, connection errors, 408, 429
+    and 5xx) is retried with jittered exponential backoff, waiting at least the
+    `Retry-After` the provider asked for. Consecutive failures open the host's
+    circuit breaker. No wait may outlive the current `deadline`.
+    """
+
+    def __init__(self):
+        self._hosts: Dict[str, Host] = {}
+
+    def configure(self, host: str, **policy: Any) -> Host:
+        self._hosts[host] = Host(**policy)
+        return self._hosts[host]
+
+    def host(self, url: str) -> Host:
+        name = urlparse(url).hostname or url
+        if name not in self._hosts:
+            self._hosts[name] = Host()
+        return self._hosts[name]
+
+    async def _acquire(self, host: Host, tokens: float):
+        async with host.lock:
+            while True:
+                wait = host.paused_until - monotonic()
+                if host.requests is not None:
+                    wait = max(wait, host.requests.delay(1))
+                if host.tokens is not None and tokens:
+                    wait = max(wait, host.tokens.delay(tokens))
+                if wait <= 0:
+                    break
+                _check_deadline(wait)
+                await asyncio.sleep(wait)
+            if host.requests is not None:
+                host.requests.take(1)
+            if host.tokens is not None and tokens:
+                host.tokens.take(tokens)
+
+    async def acquire(self, url: str, tokens: float = 0):
+        """
+        Waits for the host's limits once, for calls that can't be replayed.
+
+        Their outcome isn't reported back, so they are turned away while the
+        breaker is open but never take its half-open trial.
+        """
+        host = self.host(url)
+        _check_deadline()
+        if host.breaker.state == "open":
+            raise CircuitOpenError(503, "Circuit open", url, host.breaker.timeout)
+        await self._acquire(host, tokens)
+
+    async def run(
+        self, url: str, send: Callable[[], Awaitable[Any]], tokens: float = 0
+    ) -> Any:
+        """Runs `send` for `url` under its host's limits and retry policy."""
+        host = self.host(url)
+        delay = host.backoff
+        attempt = 0
+        while True:
+            _check_deadline()
+            trial = host.breaker.state == "half-open"
+            if not host.breaker.allow():
+                raise CircuitOpenError(503, "Circuit open", url, host.breaker.timeout)
+            left = None
+            try:
+                await self._acquire(host, tokens)
+                left = remaining()
+                result = await (
+                    send() if left is None else asyncio.wait_for(send(), left)
+                )
+            except (ApiError, ClientError, asyncio.TimeoutError) as exc:
+                if left is not None and remaining() <= 0:
+                    if trial:
+                        host.breaker.release()
+                    raise DeadlineExceeded(f"Deadline exceeded calling {url}") from exc
+                if isinstance(exc, ApiError):
+                    error = exc
+                else:
+                    error = ApiError(503, repr(exc), url)
+                    error.__cause__ = exc
+                if not error.retryable:
+                    host.breaker.success()
+                    raise error
+                if error.status != 429:
+                    host.breaker.failure()
+                else:
+                    host.breaker.success()
+                attempt += 1
+                if attempt > host.retries:
+                    raise error
+                wait = min(delay, host.max_backoff) * (0.5 + random.random())
+                if error.retry_after is not None:
+                    wait = max(wait, error.retry_after)
+                    if error.status == 429:
+                        host.paused_until = max(host.paused_until, monotonic() + wait)
+                left = remaining()
+                if left is not None and left <= wait:
+                    raise error
+                logging.warning(
+                    "Retrying %s in %.2fs (attempt %s): %s", url, wait, attempt, error
+                )
+                await asyncio.sleep(wait)
+                delay *= 2
+                continue
+            except BaseException:
+                # Cancelled or out of time before an outcome: don't keep the trial.
+                if trial:
+                    host.breaker.release()
+                raise
+            host.breaker.success()
+            return result
+
+
+def retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a `Retry-After` header given in seconds."""
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except ValueError:
+        return None
+
+
+scheduler = Scheduler()
@@ -0,0 +1,66 @@
+from typing import Any, List, Optional
+
+from .json import decode, loads_bytes
+
+
+class EventStreamParser:
+    """
+    Incremental parser for `text/event-stream` and newline-delimited JSON bodies.
+
+    `feed` takes raw bytes as they arrive and returns the payloads of the events
+    completed by them: the joined `data:` lines of an SSE event, or a whole line
+    of NDJSON. Lines are split on bytes before decoding, so a multi-byte UTF-8
+    character split across chunks is never decoded in halves, and every byte is
+    scanned once however long the stream runs.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scanned = 0
+        self._data: List[bytes] = []
+        self.last_event_id: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        buffer = self._buffer
+        buffer += chunk
+        events: List[bytes] = []
+        start = 0
+        while True:
+            end = buffer.find(b"\n", max(start, self._scanned))
+            if end == -1:
+                break
+            self._line(bytes(buffer[start:end]).rstrip(b"\r"), events)
+            start = end + 1
+        if start:
+            del buffer[:start]
+        self._scanned = len(buffer)
+        return events
+
+    def close(self) -> List[bytes]:
+        """Flushes an event left unterminated when the stream ends."""
+        events: List[bytes] = []
+        if self._buffer:
+            self._line(bytes(self._buffer).rstrip(b"\r"), events)
+            self._buffer.clear()
+            self._scanned = 0
+        self._line(b"", events)
+        return events
+
+    def _line(self, line: bytes, events: List[bytes]):
+        if not line:
+            if self._data:
+                events.append(b"\n".join(self._data))
+                self._data = []
+        elif line.startswith(b"data:"):
+            value = line[5:]
+            self._data.append(value[1:] if value.startswith(b" ") else value)
+        elif line.startswith(b"id:"):
+            self.last_event_id = line[3:].strip().decode()
+        elif line.startswith((b"{", b"[")):
+            events.append(line)
+        # Comments (":") and other fields (event, retry) are ignored.
+
+
+def parse_event(payload: bytes) -> Any:
+    """Decodes a JSON event payload, including Fauna special types."""
+    return decode(loads_bytes(payload))
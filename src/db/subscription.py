@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import random
+from typing import Any, AsyncGenerator, Dict, Optional, Set
+
+from .client import FaunaClient
+from .query import Expr
+
+_subscriptions: Dict[Expr, "Subscription"] = {}
+
+
+class Subscription:
+    """
+    One upstream Fauna event stream fanned out to any number of in-process listeners.
+
+    The upstream connection opens with the first listener and closes with the
+    last one. When it drops, it is reopened with jittered exponential backoff
+    from the last seen transaction time, and events at or before that time are
+    not delivered again. Fauna does not replay events from while the stream was
+    down, so every reconnect is announced to listeners by a fresh `start` event.
+    A listener that falls `maxsize` events behind loses its oldest events.
+    """
+
+    def __init__(
+        self,
+        client: FaunaClient,
+        expr: Expr,
+        maxsize: int = 1000,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.client = client
+        self.expr = expr
+        self.maxsize = maxsize
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.last_txn: Optional[int] = None
+        self._seen: Set[str] = set()
+        self.reconnects = 0
+        self.dropped = 0
+        self._listeners: Set["asyncio.Queue[Any]"] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def of(cls, client: FaunaClient, expr: Expr) -> "Subscription":
+        """Returns the shared subscription for `expr`, creating it on first use."""
+        subscription = _subscriptions.get(expr)
+        if subscription is None:
+            subscription = _subscriptions[expr] = cls(client, expr)
+        return subscription
+
+    async def listen(self) -> AsyncGenerator[Any, None]:
+        queue: "asyncio.Queue[Any]" = asyncio.Queue(self.maxsize)
+        self._listeners.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._listeners.discard(queue)
+            if not self._listeners and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    def _replayed(self, event: Any) -> bool:
+        """
+        Whether `event` was already delivered before a reconnect. One transaction
+        can emit several events, so those at the last seen transaction time are
+        told apart by their content rather than dropped wholesale.
+        """
+        txn = event.get("txn") if isinstance(event, dict) else None
+        if not isinstance(txn, int):
+            return False
+        if event.get("type") == "start":
+            if self.last_txn is None or txn > self.last_txn:
+                self.last_txn = txn
+                self._seen.clear()
+            return False
+        if self.last_txn is not None and txn < self.last_txn:
+            return True
+        key = repr(event.get("event"))
+        if txn == self.last_txn:
+            if key in self._seen:
+                return True
+        else:
+            self.last_txn = txn
+            self._seen.clear()
+        self._seen.add(key)
+        return False
+
+    def _publish(self, event: Any):
+        for queue in self._listeners:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    async def _run(self):
+        delay = self.backoff
+        while True:
+            try:
+                async for event in self.client.stream(self.expr, self.last_txn):
+                    if self._replayed(event):
+                        continue
+                    delay = self.backoff
+                    self._publish(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                logging.warning("Fauna stream failed: %s", exc)
+            self.reconnects += 1
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            delay = min(delay * 2, self.max_backoff)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listeners": len(self._listeners),
+            "last_txn": self.last_txn,
+            "reconnects": self.reconnects,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,58 @@
+import re
+from typing import Any, List, Tuple
+from uuid import uuid4
+
+from .json import to_wire
+from .query import Expr, _wrap
+
+_TOKEN = uuid4().hex
+
+_PLACEHOLDER = re.compile(rb'"' + _TOKEN.encode() + rb':([^"]+)"')
+
+
+class Param(Expr):
+    """A named placeholder in a `QueryTemplate`."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        super().__init__(f"{_TOKEN}:{name}")
+        object.__setattr__(self, "name", name)
+
+    def to_fauna_json(self):
+        return self.value
+
+    def __repr__(self):
+        return f"Param({self.name!r})"
+
+
+def param(name: str) -> Param:
+    return Param(name)
+
+
+class QueryTemplate:
+    """
+    A query built once with `param` placeholders and serialized ahead of time.
+
+    `render(**values)` splices the encoded values into the pre-serialized JSON,
+    so only the bound values are encoded per call:
+
+        template = QueryTemplate(q.get(q.match(q.index("user_sub_unique"), param("sub"))))
+        await client.query(template.render(sub="auth0|1234"))
+    """
+
+    def __init__(self, expr: Any):
+        parts = _PLACEHOLDER.split(to_wire(expr))
+        self._chunks: List[bytes] = parts[::2]
+        self.params: Tuple[str, ...] = tuple(name.decode() for name in parts[1::2])
+
+    def render(self, **values: Any) -> bytes:
+        chunks = self._chunks
+        body = [chunks[0]]
+        for index, name in enumerate(self.params):
+            body.append(to_wire(_wrap(values[name])))
+            body.append(chunks[index + 1])
+        return b"".join(body)
+
+    def __repr__(self):
+        return f"QueryTemplate(params={self.params})"
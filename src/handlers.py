@@ -1,57 +1,138 @@
 import asyncio
+import logging
 
 from fastapi import APIRouter, BackgroundTasks
 from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
 from .apis import *
+from .config import env
 from .tools import *
 
 app = APIRouter()
 
-@app.post("/chatbot")
-async def main(request: OpenAIEmbeddingRequest):
-    vector = (await openai.post_embeddings(request)).data[0].embedding
-    ctx = await pinecone.get_context(
-        namespace=request.namespace, vector=vector, text=request.input
-    )
+T = TypeVar("T")
+
+response_cache = ResponseCache(
+    FaunaCacheBackend()
+    if env.CHATBOT_CACHE_BACKEND == "fauna"
+    else MemoryCacheBackend(env.CHATBOT_CACHE_SIZE),
+    ttl=env.CHATBOT_CACHE_TTL,
+    threshold=env.CHATBOT_CACHE_THRESHOLD,
+    max_candidates=env.CHATBOT_CACHE_CANDIDATES,
+)
+
+async def stage(name: str, seconds: float, call: Awaitable[T]) -> Optional[T]:
+    """
+    Runs a pipeline stage within `seconds` (and the request deadline). Returns
+    None when it runs out of time or its provider fails, so the caller can degrade.
+    """
+    try:
+        with deadline(seconds):
+            return await asyncio.wait_for(call, max(remaining(), 0))
+    except (DeadlineExceeded, ApiError, asyncio.TimeoutError) as exc:
+        logging.warning("Chatbot %s stage skipped: %s", name, exc)
+        return None
+
+async def lookup(request: OpenAIEmbeddingRequest) -> Tuple[Optional[str], Optional[Vector]]:
+    """Returns a cached answer if there is one, otherwise the question embedding."""
+    cached = await response_cache.get(request.namespace, request.input)
+    if cached is not None:
+        return cached, None
+    vector = await openai.embed(request)
+    return await response_cache.similar(request.namespace, vector), vector
+
+async def build_prompt(
+    request: OpenAIEmbeddingRequest, vector: Optional[Vector]
+) -> Tuple[OpenAIChatGptRequest, bool]:
+    """
+    Builds the completion request. Without a vector, or when retrieval runs out
+    of time, the question is answered without context and flagged as degraded.
+    """
+    ctx = None
+    if vector is not None:
+        ctx = await stage(
+            "retrieval",
+            env.CHATBOT_RETRIEVAL_TIMEOUT,
+            pinecone.get_context(namespace=request.namespace, vector=vector),
+        )
     req = OpenAIChatCompletionRequest(
         prompt=request.input,
         namespace=request.namespace,
-        context=ctx,
+        context=ctx or {},
         role="lead-generation-machine",
     )
     content = req.chain()
-    gpt_request = OpenAIChatGptRequest().chain(content, request.input)
-    response = await openai.text_completion(gpt_request)
+    return OpenAIChatGptRequest().chain(content, request.input), ctx is None
+
+async def prepare(
+    request: OpenAIEmbeddingRequest,
+) -> Tuple[Optional[str], Optional[Vector], Optional[OpenAIChatGptRequest], bool]:
+    """
+    Runs the lookup and retrieval stages: a cached answer, or the prompt to
+    complete, its question vector and whether it lacks context.
+    """
+    found = await stage("embedding", env.CHATBOT_EMBEDDING_TIMEOUT, lookup(request))
+    cached, vector = found if found is not None else (None, None)
+    if cached is not None:
+        return cached, None, None, False
+    gpt_request, degraded = await build_prompt(request, vector)
+    return None, vector, gpt_request, degraded
+
+async def remember(request: OpenAIEmbeddingRequest, vector: Vector, text: str):
+    memory.remember(request.namespace, request.input, vector, id=request.input)
+    memory.remember(request.namespace, text)
+    await response_cache.set(request.namespace, request.input, vector, text)
+
+@app.post("/chatbot")
+async def main(request: OpenAIEmbeddingRequest):
+    with deadline(env.CHATBOT_DEADLINE):
+        cached, vector, gpt_request, degraded = await prepare(request)
+        if cached is not None:
+            return PlainTextResponse(cached)
+        response = await openai.text_completion(gpt_request)
     text = response.choices[0].message.content
-    vector = (
-        (
-            await openai.post_embeddings(
-                OpenAIEmbeddingRequest(input=text, namespace=request.namespace)
-            )
-        )
-        .data[0]
-        .embedding
+    if degraded:
+        # Answered without context; don't learn or cache it.
+        return PlainTextResponse(text)
+    return PlainTextResponse(
+        text, background=BackgroundTask(remember, request, vector, text)
     )
-    await pinecone.upsert(
-        request.namespace,
-        PineconeVector(
-            values=vector,
-            metadata={"text": text},
-        ),
+
+@app.post("/chatbot/stream")
+async def main_stream(request: OpenAIEmbeddingRequest):
+    """
+    Streams the answer token by token. Tokens only arrive incrementally under an
+    ASGI server such as uvicorn: behind Mangum on Lambda the whole body is
+    buffered and delivered at once.
+    """
+    with deadline(env.CHATBOT_DEADLINE):
+        cached, vector, gpt_request, degraded = await prepare(request)
+    if cached is not None:
+        return StreamingResponse(iter([cached]), media_type="text/plain")
+    parts: List[str] = []
+    completed = False
+
+    async def tokens():
+        nonlocal completed
+        async for token in openai.stream_completion(gpt_request):
+            parts.append(token)
+            yield token
+        completed = True
+
+    async def after():
+        # The background task also runs after a client disconnect cut the
+        # stream short; only a complete answer is remembered.
+        if completed and parts and not degraded:
+            await remember(request, vector, "".join(parts))
+
+    return StreamingResponse(
+        tokens(), media_type="text/plain", background=BackgroundTask(after)
     )
-    return PlainTextResponse(text)
 
 async def get_embeddings(namespace: str):
     pages = await sitemap_tool.run(namespace)
-    requests = [
-        OpenAIEmbeddingRequest(input=page.content, namespace=namespace)
-        for page in pages
-    ]
-    responses: List[OpenAIEmbeddingResponse] = await asyncio.gather(
-        *[openai.post_embeddings(request) for request in requests]
-    )
-    embeddings = [response.data[0].embedding for response in responses]
+    embeddings = await openai.post_embeddings_batch([page.content for page in pages])
     vectors = [
         PineconeVector(values=vector, metadata={"text": page.content})
         for vector, page in zip(embeddings, pages)
@@ -60,10 +141,14 @@ async def get_embeddings(namespace: str):
 
 async def ingest_data(namespace: str):
     vectors = await get_embeddings(namespace)
-    data = await asyncio.gather(
-        *[pinecone.upsert(namespace, vector) for vector in vectors]
-    )
-    return data
+    report = await pinecone.upsert_many(namespace, vectors)
+    for failure in report.failures:
+        logging.error("Upsert chunk %s failed: %s", failure.chunk, failure.error)
+    return report
+
+@app.get("/chatbot/metrics")
+async def metrics():
+    return {"memory": memory.stats()}
 
 @app.get("/chatbot/ingest")
 async def ingest(background_tasks: BackgroundTasks, namespace: str):
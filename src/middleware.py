@@ -1,17 +1,108 @@
 import asyncio
+import fnmatch
+import functools
+import re
 
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from geocoder import ip
 
+from .config import env
 from .handlers import *
+from .tools.geoip import GeoIP
+from .tools.writebehind import WriteBehindQueue
+
+geoip = GeoIP(env.GEOIP_DATABASE, env.GEOIP_CACHE_SIZE)
+
+visits: WriteBehindQueue[LeadVisit] = WriteBehindQueue(
+    Lead.record_visits,
+    maxsize=env.LEAD_QUEUE_SIZE,
+    batch_size=env.LEAD_BATCH_SIZE,
+    interval=env.LEAD_FLUSH_INTERVAL,
+)
+
+
+class RouteFilter:
+    """
+    Declares which requests a middleware applies to, by glob path patterns
+    (`include` / `exclude`) and HTTP methods.
+    """
+
+    def __init__(
+        self,
+        include: Sequence[str] = ("*",),
+        exclude: Sequence[str] = (),
+        methods: Optional[Sequence[str]] = None,
+    ):
+        self.include = self._compile(include)
+        self.exclude = self._compile(exclude)
+        self.methods = {method.upper() for method in methods} if methods else None
+
+    @staticmethod
+    def _compile(patterns: Sequence[str]) -> Optional[Pattern[str]]:
+        if not patterns:
+            return None
+        return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+    def matches(self, request: Request) -> bool:
+        if self.methods is not None and request.method not in self.methods:
+            return False
+        path = request.url.path
+        if self.exclude is not None and self.exclude.match(path):
+            return False
+        return self.include is not None and self.include.match(path) is not None
+
+
+def scoped(route_filter: RouteFilter):
+    """Skips the decorated middleware for requests the filter does not match."""
+
+    def decorator(middleware: Callable) -> Callable:
+        @functools.wraps(middleware)
+        async def wrapper(request: Request, call_next: Callable) -> Response:
+            if not route_filter.matches(request):
+                return await call_next(request)
+            return await middleware(request, call_next)
+
+        return wrapper
+
+    return decorator
+
+
+AUTH_ROUTES = RouteFilter(include=["/api/*"])
+
+IDENTITY_ROUTES = RouteFilter(include=["/api/*"])
+
+LEAD_ROUTES = RouteFilter(
+    exclude=[
+        "/docs*",
+        "/redoc*",
+        "/openapi.json",
+        "/health*",
+        "/favicon.ico",
+        "*.js",
+        "*.css",
+        "*.map",
+        "*.png",
+        "*.jpg",
+        "*.jpeg",
+        "*.gif",
+        "*.svg",
+        "*.ico",
+        "*.webp",
+        "*.woff",
+        "*.woff2",
+        "*.ttf",
+    ],
+    methods=["GET", "POST"],
+)
 
 
 def bootstrap():
     app_ = FastAPI()
 
     @app_.middleware("http")
+    @scoped(AUTH_ROUTES)
     async def auth_middleware(request: Request, call_next: Callable) -> Response:
         token = request.headers.get("Authorization", None)
         request.state.token = token
@@ -19,6 +110,15 @@ def bootstrap():
         return response
     
     @app_.middleware("http")
+    @scoped(IDENTITY_ROUTES)
+    async def identity_map_middleware(
+        request: Request, call_next: Callable
+    ) -> Response:
+        with identity_map():
+            return await call_next(request)
+
+    @app_.middleware("http")
+    @scoped(LEAD_ROUTES)
     async def lead_gen_middleware(request: Request, call_next: Callable) -> Response:
         response = await call_next(request)
         lead_id = request.cookies.get("lead_id", None)
@@ -27,7 +127,7 @@ def bootstrap():
             raise HTTPException(400, "No client found")
         if client.host is None:
             raise HTTPException(400, "No host found")
-        geo_data = ip(client.host).json["raw"]
+        geo_data = geoip.lookup(client.host)
         now = datetime.now().timestamp()
         if lead_id is None:
             lead_id = uuid4().hex
@@ -35,15 +135,27 @@ def bootstrap():
         ip_addr = client.host
         if not ip_addr:
             ip_addr = "0.0.0.0"
-        lead = Lead(ipaddr=ip_addr, lead_id=lead_id, geo_data=geo_data)
-        if isinstance(lead.visits, list):
-            lead.visits.append(now)
-        else:
-            lead.visits = [now]
-        await lead.save()
+        visits.put(
+            LeadVisit(lead_id=lead_id, ipaddr=ip_addr, geo_data=geo_data, ts=now)
+        )
         return response
     
 
+    @app_.exception_handler(ApiError)
+    async def api_error_handler(request: Request, exc: ApiError) -> Response:
+        headers = None
+        if exc.retry_after is not None:
+            headers = {"Retry-After": str(int(exc.retry_after) + 1)}
+        return JSONResponse(
+            {"status": "error", "message": str(exc)},
+            status_code=503 if exc.retryable else 502,
+            headers=headers,
+        )
+
+    @app_.exception_handler(DeadlineExceeded)
+    async def deadline_handler(request: Request, exc: DeadlineExceeded) -> Response:
+        return JSONResponse({"status": "error", "message": str(exc)}, status_code=504)
+
     app_.include_router(app, prefix="/api")
     app_.mount("/", StaticFiles(directory="static",html=True), name="static")
     app_.add_middleware(
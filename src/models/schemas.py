@@ -36,7 +36,10 @@ class User(FaunaModel):
     picture: Optional[str] = Field(default=None)
     sub: str = Field(..., unique=True)
     updated_at: Optional[str] = Field(default=None)
- 
+
+    class Config:
+        cache_ttl = 300
+        cache_maxsize = 4096
 
 
 class Upload(FaunaModel):
@@ -73,6 +76,65 @@ class Lead(FaunaModel):
     visits: Optional[List[float]] = Field(default=None)
     geo_data: Optional[dict] = Field(default=None)
 
+    @classmethod
+    async def record_visits(cls, visits: List["LeadVisit"]) -> None:
+        """
+        Upserts every visited lead by `lead_id` and appends its visit timestamps,
+        all in a single Fauna transaction.
+        """
+        leads: Dict[str, List[LeadVisit]] = {}
+        for visit in visits:
+            leads.setdefault(visit.lead_id, []).append(visit)
+        expressions = []
+        for lead_id, lead_visits in leads.items():
+            last = lead_visits[-1]
+            timestamps = [visit.ts for visit in lead_visits]
+            match = q.match(q.index("lead_lead_id_unique"), lead_id)
+            data: Dict[str, Any] = {"ipaddr": last.ipaddr}
+            if last.geo_data is not None:
+                data["geo_data"] = last.geo_data
+            expressions.append(
+                q.if_(
+                    q.exists(match),
+                    q.let(
+                        {"doc": q.get(match)},
+                        q.update(
+                            q.select("ref", q.var("doc")),
+                            {
+                                "data": {
+                                    **data,
+                                    "visits": q.append(
+                                        timestamps,
+                                        q.select(["data", "visits"], q.var("doc"), []),
+                                    ),
+                                }
+                            },
+                        ),
+                    ),
+                    q.create(
+                        q.collection(cls.__name__.lower()),
+                        {
+                            "data": cls(
+                                lead_id=lead_id, visits=timestamps, **data
+                            ).dict()
+                        },
+                    ),
+                )
+            )
+        if expressions and await cls.q()(q.do(*expressions)) is None:
+            raise FaunaException(500, "Recording lead visits failed", None)
+
+
+class LeadVisit(BaseModel):
+    """
+    A single page visit waiting to be recorded on its lead
+    """
+
+    lead_id: str = Field(...)
+    ipaddr: str = Field(...)
+    geo_data: Optional[dict] = Field(default=None)
+    ts: float = Field(...)
+
 class Product(FaunaModel):
     name: str = Field(...)
     description: Optional[str] = Field(default=None)
@@ -81,6 +143,11 @@ class Product(FaunaModel):
     media: Optional[List[Upload]] = Field(default=None)
     user: Optional[User] = Field(default=None)
 
+    class Config:
+        cache_ttl = 60
+        cache_maxsize = 256
+        cache_stream = True
+
 
 class Deal(FaunaModel):
     payment_method: PaymentMethod = Field(default="cash")
@@ -162,3 +229,17 @@ class PaymentsReport(FaunaModel):
 class TasksReport(FaunaModel):
     tasks: List[Task] = Field(...)
     criteria: Literal["due_date", "status"] = Field(...)
+
+
+class CachedResponse(FaunaModel):
+    """
+    Chatbot answer shared between instances by the Fauna response cache backend
+    """
+
+    key: str = Field(..., unique=True)
+    namespace: str = Field(..., index=True)
+    input: str = Field(...)
+    text: str = Field(...)
+    vector: Optional[List[float]] = Field(default=None)
+    norm: Optional[float] = Field(default=None)
+    expires: float = Field(...)
@@ -1,3 +1,5 @@
+from .cache import *
+from .embeddings import *
 from .sitemap import *
 from .synthesis import *
 from .templating import *
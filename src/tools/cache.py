@@ -0,0 +1,201 @@
+import hashlib
+import logging
+import math
+import operator
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from itertools import islice
+from typing import List, Optional
+
+from ..models import CachedResponse, FaunaException, q
+
+
+def normalize(text: str) -> str:
+    """Case-folds and collapses whitespace so trivially different inputs share a key."""
+    return " ".join(text.casefold().split())
+
+
+def norm(a: List[float]) -> float:
+    return math.sqrt(sum(map(operator.mul, a, a)))
+
+
+def cosine(
+    a: List[float],
+    b: List[float],
+    norm_a: Optional[float] = None,
+    norm_b: Optional[float] = None,
+) -> float:
+    """Cosine similarity, reusing norms the caller already knows."""
+    dot = sum(map(operator.mul, a, b))
+    scale = (norm(a) if norm_a is None else norm_a) * (
+        norm(b) if norm_b is None else norm_b
+    )
+    return dot / scale if scale else 0.0
+
+
+class CacheBackend(ABC):
+    """Storage for cached chatbot answers."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        ...
+
+    @abstractmethod
+    async def set(self, entry: CachedResponse) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def entries(self, namespace: str, limit: int) -> List[CachedResponse]:
+        """Up to `limit` candidates for a similarity lookup, newest first."""
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU backend."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, entry: CachedResponse) -> None:
+        self._entries[entry.key] = entry
+        self._entries.move_to_end(entry.key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def entries(self, namespace: str, limit: int) -> List[CachedResponse]:
+        return list(
+            islice(
+                (
+                    entry
+                    for entry in reversed(self._entries.values())
+                    if entry.namespace == namespace
+                ),
+                limit,
+            )
+        )
+
+
+class FaunaCacheBackend(CacheBackend):
+    """
+    Backend shared by every instance, stored in the `cachedresponse` collection.
+
+    Documents are written with a Fauna `ttl` at their expiry, so Fauna purges
+    them; until it does, expired entries are still filtered out on read.
+    """
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return await CachedResponse.find_unique("key", key)
+
+    async def set(self, entry: CachedResponse) -> None:
+        match = q.match(q.index("cachedresponse_key_unique"), entry.key)
+        params = {
+            "data": entry.dict(exclude={"ref", "ts"}),
+            "ttl": q.epoch(int(entry.expires), "second"),
+        }
+        await CachedResponse.q()(
+            q.if_(
+                q.exists(match),
+                q.update(q.select("ref", q.get(match)), params),
+                q.create(q.collection("cachedresponse"), params),
+            )
+        )
+        CachedResponse._invalidate()  # pylint: disable=protected-access
+
+    async def delete(self, key: str) -> None:
+        await CachedResponse.delete_one("key", key)
+
+    async def entries(self, namespace: str, limit: int) -> List[CachedResponse]:
+        try:
+            page = await CachedResponse.q()(
+                q.map_(
+                    q.lambda_("ref", q.get(q.var("ref"))),
+                    q.paginate(
+                        q.reverse(
+                            q.match(q.index("cachedresponse_namespace"), namespace)
+                        ),
+                        size=limit,
+                    ),
+                )
+            )
+            # pylint: disable=protected-access
+            return [CachedResponse._from_data(data) for data in page["data"]]
+
+        except (FaunaException, KeyError, TypeError) as exc:
+            logging.error(exc)
+            return []
+
+
+class ResponseCache:
+    """
+    Caches chatbot answers by normalized `(namespace, input)` and, failing an
+    exact hit, by embedding similarity to previously answered questions.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: float = 3600,
+        threshold: float = 0.95,
+        max_candidates: int = 64,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+
+    @staticmethod
+    def key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{normalize(text)}".encode()).hexdigest()
+
+    async def get(self, namespace: str, text: str) -> Optional[str]:
+        key = self.key(namespace, text)
+        entry = await self.backend.get(key)
+        if entry is None:
+            return None
+        if entry.expires < time.time():
+            await self.backend.delete(key)
+            return None
+        return entry.text
+
+    async def similar(self, namespace: str, vector: List[float]) -> Optional[str]:
+        now = time.time()
+        best, best_score = None, self.threshold
+        vector_norm = norm(vector)
+        candidates = await self.backend.entries(namespace, self.max_candidates)
+        for entry in candidates:
+            if entry.vector is None or entry.expires < now:
+                continue
+            score = cosine(vector, entry.vector, vector_norm, entry.norm)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best.text if best is not None else None
+
+    async def set(
+        self, namespace: str, text: str, vector: Optional[List[float]], answer: str
+    ) -> None:
+        await self.backend.set(
+            CachedResponse(
+                key=self.key(namespace, text),
+                namespace=namespace,
+                input=text,
+                text=answer,
+                vector=vector,
+                norm=norm(vector) if vector is not None else None,
+                expires=time.time() + self.ttl,
+            )
+        )
@@ -0,0 +1,184 @@
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from ..models import Vector
+
+_ITEMSIZE = array("f").itemsize
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Content hash of an embedding input; whitespace-only differences share a key."""
+    return hashlib.sha256(f"{model}\0{' '.join(text.split())}".encode()).hexdigest()
+
+
+class _VectorFile:
+    """
+    Fixed-width float32 rows of one dimension, appended to and read through mmap.
+
+    Several processes may share the file, so a row's number is taken from the
+    file's length under an exclusive `flock`, never from a local counter.
+    """
+
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.row = dim * _ITEMSIZE
+        self._file = open(path, "a+b")  # pylint: disable=consider-using-with
+        self._map: Optional[mmap.mmap] = None
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def append(self, vector: Sequence[float]) -> int:
+        """Appends a row and returns its number. Call it holding `locked()`."""
+        size = os.fstat(self._file.fileno()).st_size
+        if size % self.row:
+            # A torn append from a writer that died; drop the partial row.
+            self._file.truncate(size - size % self.row)
+        self._file.write(array("f", vector).tobytes())
+        self._file.flush()
+        return size // self.row
+
+    def read(self, row: int) -> Optional[Vector]:
+        end = (row + 1) * self.row
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if os.fstat(self._file.fileno()).st_size < end:
+                return None
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        values = array("f")
+        values.frombytes(self._map[row * self.row : end])
+        return values.tolist()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class EmbeddingStore:
+    """
+    Content-addressed embedding cache: an in-memory LRU in front of a local disk store.
+
+    Vectors are keyed by `embedding_key(model, text)`. On disk they are kept as
+    float32 rows in one `<dim>.f32` file per dimension, read back through mmap,
+    with an append-only `index` of `key dim row` lines. Appends are serialized
+    with `flock`, so processes sharing the directory never mis-number rows; each
+    only sees the index entries that existed when it opened the store, plus its
+    own. The disk tier survives restarts of a warm container, so re-embedding
+    unchanged content is free.
+    Without a `path`, or if it can't be written, only the memory tier is used.
+    """
+
+    def __init__(self, path: Optional[str] = None, maxsize: int = 4096):
+        self.path = path
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Vector]" = OrderedDict()
+        self._index: Optional[Dict[str, Tuple[int, int]]] = None
+        self._files: Dict[int, _VectorFile] = {}
+        self._log = None
+
+    def _open(self) -> Dict[str, Tuple[int, int]]:
+        if self._index is not None:
+            return self._index
+        self._index = {}
+        if not self.path:
+            return self._index
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            index = os.path.join(self.path, "index")
+            torn = False
+            if os.path.exists(index):
+                with open(index, "r", encoding="utf-8") as lines:
+                    for line in lines:
+                        parts = line.split()
+                        # An unterminated last line is a torn write; skip it.
+                        torn = not line.endswith("\n")
+                        if not torn and len(parts) == 3:
+                            self._index[parts[0]] = (int(parts[1]), int(parts[2]))
+            self._log = open(index, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+            if torn:
+                self._log.write("\n")
+        except (OSError, ValueError) as exc:
+            logging.warning("Embedding store at %s disabled: %s", self.path, exc)
+            self.path = None
+        return self._index
+
+    def _file(self, dim: int) -> _VectorFile:
+        if dim not in self._files:
+            self._files[dim] = _VectorFile(os.path.join(self.path, f"{dim}.f32"), dim)
+        return self._files[dim]
+
+    def _remember(self, key: str, vector: Vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Vector]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return vector
+        location = self._open().get(key)
+        if location is not None and self.path:
+            dim, row = location
+            try:
+                vector = self._file(dim).read(row)
+            except OSError as exc:
+                logging.warning("Embedding store read failed: %s", exc)
+        if vector is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, vector)
+        return vector
+
+    def set(self, key: str, vector: Vector):
+        self._remember(key, vector)
+        index = self._open()
+        if not self.path or key in index:
+            return
+        try:
+            file = self._file(len(vector))
+            with file.locked():
+                row = file.append(vector)
+                self._log.write(f"{key} {len(vector)} {row}\n")
+                self._log.flush()
+        except OSError as exc:
+            logging.warning("Embedding store write failed: %s", exc)
+            return
+        index[key] = (len(vector), row)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory": len(self._memory),
+            "disk": len(self._index or {}),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self._index = None
@@ -0,0 +1,167 @@
+"""
+Offline IP geolocation.
+
+The database is a compact sorted-range table that is memory-mapped and binary
+searched, so a lookup never leaves the process:
+
+    header   "GIP1" | record count (uint32) | reserved (uint32)
+    records  start (16 bytes) | end (16 bytes) | offset (uint32) | length (uint32)
+    data     UTF-8 JSON objects referenced by the records
+
+Addresses are stored as 16-byte big-endian integers (IPv4 as IPv4-mapped IPv6),
+so both families share one table ordered by `start`. Build a table from a CSV
+with `start_ip,end_ip,<geo fields...>` columns:
+
+    python -m src.tools.geoip build ranges.csv geoip.bin
+
+MaxMind `.mmdb` files are used instead when the optional `maxminddb` package is
+installed.
+"""
+import csv
+import ipaddress
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    import maxminddb
+except ImportError:
+    maxminddb = None
+
+MAGIC = b"GIP1"
+HEADER = struct.Struct("<4sII")
+RECORD = struct.Struct("<16s16sII")
+
+GeoData = Dict[str, Any]
+
+
+def pack_ip(address: str) -> bytes:
+    ip = ipaddress.ip_address(address)
+    if isinstance(ip, ipaddress.IPv4Address):
+        ip = ipaddress.IPv6Address(f"::ffff:{ip}")
+    return ip.packed
+
+
+def build(ranges: Iterable[Tuple[str, str, GeoData]], path: str) -> int:
+    """Writes a range table from `(start_ip, end_ip, geo_data)` rows. Returns the record count."""
+    rows = sorted(
+        (pack_ip(start), pack_ip(end), json.dumps(data, separators=(",", ":")))
+        for start, end, data in ranges
+    )
+    blobs: Dict[str, Tuple[int, int]] = {}
+    data = bytearray()
+    records = bytearray()
+    for start, end, blob in rows:
+        if blob not in blobs:
+            encoded = blob.encode()
+            blobs[blob] = (len(data), len(encoded))
+            data += encoded
+        offset, length = blobs[blob]
+        records += RECORD.pack(start, end, offset, length)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(rows), 0))
+        file.write(records)
+        file.write(data)
+    return len(rows)
+
+
+class RangeTable:
+    """Memory-mapped reader for the range table format."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a GeoIP range table")
+        self._data = HEADER.size + self.count * RECORD.size
+        if len(self._map) < self._data:
+            self._map.close()
+            raise ValueError(f"{path} is truncated")
+
+    def get(self, address: str) -> Optional[GeoData]:
+        key = pack_ip(address)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = self._map[
+                HEADER.size + middle * RECORD.size : HEADER.size + middle * RECORD.size + 16
+            ]
+            if start <= key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return None
+        _, end, offset, length = RECORD.unpack_from(
+            self._map, HEADER.size + (low - 1) * RECORD.size
+        )
+        if key > end:
+            return None
+        start = self._data + offset
+        return json.loads(self._map[start : start + length])
+
+    def close(self):
+        self._map.close()
+
+
+class GeoIP:
+    """
+    IP-to-geo lookups against a local database with an LRU in front.
+
+    The database is opened lazily; when it is missing or can't be opened, the
+    problem is logged once and lookups return None.
+    """
+
+    def __init__(self, path: str, cache_size: int = 4096):
+        self.path = path
+        self._reader: Any = None
+        self._missing = False
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def _open(self) -> Any:
+        if self._reader is None and not self._missing:
+            try:
+                if not os.path.exists(self.path):
+                    raise FileNotFoundError("not found")
+                if self.path.endswith(".mmdb"):
+                    if maxminddb is None:
+                        raise ImportError("reading .mmdb files needs maxminddb")
+                    self._reader = maxminddb.open_database(
+                        self.path, maxminddb.MODE_MMAP
+                    )
+                else:
+                    self._reader = RangeTable(self.path)
+            # maxminddb raises InvalidDatabaseError, a RuntimeError.
+            except (OSError, ImportError, ValueError, RuntimeError, struct.error) as exc:
+                logging.warning("GeoIP database %s unavailable: %s", self.path, exc)
+                self._missing = True
+        return self._reader
+
+    def _lookup(self, address: str) -> Optional[GeoData]:
+        reader = self._open()
+        if reader is None:
+            return None
+        try:
+            return reader.get(address)
+        except (ValueError, struct.error):
+            return None
+
+
+def _read_csv(path: str) -> Iterable[Tuple[str, str, GeoData]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            start, end = row.pop("start_ip"), row.pop("end_ip")
+            yield start, end, row
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        sys.exit("usage: python -m src.tools.geoip build <ranges.csv> <output.bin>")
+    print(f"{build(_read_csv(sys.argv[2]), sys.argv[3])} ranges written")
@@ -3,10 +3,11 @@ import json
 import re
 from typing import List
 
-from aiohttp import ClientSession
 from bs4 import BeautifulSoup
 from pydantic import BaseModel, Field
 
+from ..db.pool import pool
+
 
 class Page(BaseModel):
     title: str = Field(..., description="Title of the page")
@@ -56,8 +57,8 @@ class SiteMapTool:
         self.semaphore = asyncio.Semaphore(max_connections)
 
     async def fetch_loc(self, url: str):
-        async with self.semaphore, ClientSession() as session:
-            async with session.get(url) as response:
+        async with self.semaphore:
+            async with pool.session().get(url) as response:
                 try:
                     assert response.status == 200
                     html = (await response.text()).strip()
@@ -83,8 +84,8 @@ class SiteMapTool:
         return await self.fetch_loc(sitemap_url)
 
     async def fetch_page(self, url: str) -> Page:
-        async with self.semaphore, ClientSession() as session:
-            async with session.get(url) as response:
+        async with self.semaphore:
+            async with pool.session().get(url) as response:
                 try:
                     assert response.status == 200
                     html = await response.text()
@@ -257,10 +257,17 @@ const generateResponse = (incomingChatLi) => {
     }),
   };
   fetch(API_URL, requestOptions)
-    .then((res) => res.json())
-    .then((data) => {
-      console.log(data);
-      messageElement.textContent = data.response;
+    .then(async (res) => {
+      if (!res.ok || !res.body) throw new Error(res.statusText);
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      messageElement.textContent = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        messageElement.textContent += decoder.decode(value, { stream: true });
+        chatBox.scrollTo(0, chatBox.scrollHeight);
+      }
     })
     .catch((error) => {
       messageElement.classList.add('error');
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class WriteBehindQueue(Generic[T]):
+    """
+    Bounded in-process buffer that hands items to `flush` in batches.
+
+    A batch is flushed once `batch_size` items are queued or `interval` seconds
+    after the first item of the batch arrived, whichever comes first. When the
+    buffer holds `maxsize` items, new items are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[T]], Awaitable[Any]],
+        maxsize: int = 10000,
+        batch_size: int = 100,
+        interval: float = 1.0,
+    ):
+        self._flush = flush
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.interval = interval
+        self._items: Deque[T] = deque()
+        self._event: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+        self._since: Optional[float] = None
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def put(self, item: T) -> bool:
+        """Queues an item without waiting. Returns False if it was dropped."""
+        if len(self._items) >= self.maxsize:
+            self.dropped += 1
+            return False
+        if not self._items:
+            self._since = time.time()
+        self._items.append(item)
+        if self._event is None:
+            self._event = asyncio.Event()
+        self._event.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+        return True
+
+    async def _run(self):
+        assert self._event is not None
+        loop = asyncio.get_running_loop()
+        while not self._closing:
+            if not self._items:
+                self._event.clear()
+                await self._event.wait()
+                continue
+            deadline = loop.time() + self.interval
+            while len(self._items) < self.batch_size and not self._closing:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._event.clear()
+                try:
+                    await asyncio.wait_for(self._event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            await self._drain()
+
+    async def _drain(self):
+        batch = [self._items.popleft() for _ in range(min(self.batch_size, len(self._items)))]
+        if not batch:
+            return
+        if not self._items:
+            self._since = None
+        self.flushes += 1
+        try:
+            await self._flush(batch)
+            self.written += len(batch)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.failed += len(batch)
+            logging.error("Write-behind flush of %s items failed: %s", len(batch), exc)
+
+    async def flush(self):
+        """Writes everything currently queued."""
+        while self._items:
+            await self._drain()
+
+    async def settle(self, max_age: float):
+        """
+        Flushes now only if a full batch is queued or the oldest item has waited
+        `max_age` seconds; otherwise leaves the items to batch with later ones.
+        """
+        if len(self._items) >= self.batch_size or (
+            self._since is not None and time.time() - self._since >= max_age
+        ):
+            await self.flush()
+
+    async def close(self):
+        """Stops the background worker and flushes what is left."""
+        self._closing = True
+        if self._event is not None:
+            self._event.set()
+        if self._worker is not None:
+            await self._worker
+            self._worker = None
+        await self.flush()
+        self._closing = False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": len(self._items),
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+# Settings the app requires at import time; tests never reach these services.
+for name in (
+    "FAUNA_SECRET",
+    "AUTH0_URL",
+    "OPENAI_API_KEY",
+    "PINECONE_API_KEY",
+    "PINECONE_API_URL",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "REGION_NAME",
+):
+    os.environ.setdefault(name, "test")
+
+# The app serves the frontend build from ./static, which isn't part of the repo.
+_cwd = tempfile.mkdtemp()
+os.makedirs(os.path.join(_cwd, "static"))
+os.chdir(_cwd)
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+
+import src.apis.openai  # pylint: disable=unused-import
+from src.tools.embeddings import EmbeddingStore, embedding_key
+
+
+def test_vectors_survive_a_restart(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.set("k1", [0.5, 1.0, -2.0])
+    store.close()
+
+    store = EmbeddingStore(str(tmp_path))
+    assert store.get("k1") == [0.5, 1.0, -2.0]
+
+
+def test_writers_sharing_a_directory_keep_rows_apart(tmp_path):
+    first = EmbeddingStore(str(tmp_path))
+    second = EmbeddingStore(str(tmp_path))
+    first.set("k1", [1.0, 1.0])
+    second.set("k2", [2.0, 2.0])
+    first.set("k3", [3.0, 3.0])
+    first.close()
+    second.close()
+
+    store = EmbeddingStore(str(tmp_path))
+    assert store.get("k1") == [1.0, 1.0]
+    assert store.get("k2") == [2.0, 2.0]
+    assert store.get("k3") == [3.0, 3.0]
+
+
+def test_torn_index_line_is_skipped(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.set("k1", [1.0, 1.0])
+    store.close()
+    with open(tmp_path / "index", "a", encoding="utf-8") as index:
+        index.write("k2 2")
+
+    store = EmbeddingStore(str(tmp_path))
+    assert store.get("k2") is None
+    store.set("k3", [3.0, 3.0])
+    store.close()
+
+    store = EmbeddingStore(str(tmp_path))
+    assert store.get("k1") == [1.0, 1.0]
+    assert store.get("k3") == [3.0, 3.0]
+
+
+def test_torn_row_is_dropped(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.set("k1", [1.0, 1.0])
+    store.close()
+    with open(tmp_path / "2.f32", "ab") as vectors:
+        vectors.write(b"\0\0\0")
+
+    store = EmbeddingStore(str(tmp_path))
+    store.set("k2", [2.0, 2.0])
+    store.close()
+
+    assert os.path.getsize(tmp_path / "2.f32") == 16
+    store = EmbeddingStore(str(tmp_path))
+    assert store.get("k1") == [1.0, 1.0]
+    assert store.get("k2") == [2.0, 2.0]
+
+
+def test_keys_ignore_whitespace_but_not_model():
+    assert embedding_key("m", "a  b\n") == embedding_key("m", "a b")
+    assert embedding_key("m", "a b") != embedding_key("n", "a b")
+
+
+def test_batches_that_succeed_are_kept_when_another_fails(tmp_path, monkeypatch):
+    openai = sys.modules["src.apis.openai"]
+    monkeypatch.setattr(openai, "EMBEDDING_MAX_INPUTS", 1)
+    client = openai.OpenAIClient()
+    client.embeddings = EmbeddingStore(str(tmp_path))
+
+    async def fetch(url, method, headers, json, tokens=0):
+        (text,) = json["input"]
+        if text == "bad":
+            raise openai.ApiError(500, "failed")
+        return {
+            "object": "list",
+            "model": json["model"],
+            "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            "data": [{"object": "embedding", "index": 0, "embedding": [1.0]}],
+        }
+
+    client.fetch = fetch
+    try:
+        asyncio.run(client.post_embeddings_batch(["good", "bad"]))
+    except openai.ApiError:
+        pass
+    else:
+        raise AssertionError("the failed batch should raise")
+
+    assert client.embeddings.get(embedding_key("text-embedding-ada-002", "good")) == [1.0]
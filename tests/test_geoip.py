@@ -0,0 +1,34 @@
+from src.tools.geoip import GeoIP, RangeTable, build
+
+
+def test_range_table_round_trip(tmp_path):
+    path = str(tmp_path / "geoip.bin")
+    count = build(
+        [
+            ("10.0.0.0", "10.0.0.255", {"country": "AA"}),
+            ("1.2.3.0", "1.2.3.255", {"country": "BB"}),
+            ("2001:db8::", "2001:db8::ffff", {"country": "CC"}),
+        ],
+        path,
+    )
+    assert count == 3
+
+    table = RangeTable(path)
+    assert table.get("1.2.3.4") == {"country": "BB"}
+    assert table.get("10.0.0.255") == {"country": "AA"}
+    assert table.get("2001:db8::1") == {"country": "CC"}
+    assert table.get("10.0.1.0") is None
+    assert table.get("0.0.0.1") is None
+    table.close()
+
+
+def test_unreadable_database_disables_lookups(tmp_path):
+    for name, content in [("geoip.bin", b"GIP1\xff\xff\x00\x00"), ("geo.mmdb", b"junk")]:
+        path = tmp_path / name
+        path.write_bytes(content)
+        geoip = GeoIP(str(path))
+        assert geoip.lookup("1.2.3.4") is None
+        assert geoip.lookup("5.6.7.8") is None
+        assert geoip._missing  # pylint: disable=protected-access
+
+    assert GeoIP(str(tmp_path / "absent.bin")).lookup("1.2.3.4") is None
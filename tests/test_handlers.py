@@ -0,0 +1,71 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import src.handlers  # pylint: disable=unused-import
+
+handlers = sys.modules["src.handlers"]
+
+
+def completion(text):
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_answer_without_context_is_not_remembered(monkeypatch):
+    async def embed(request):
+        return [1.0, 0.0]
+
+    async def get_context(namespace, vector):
+        await asyncio.sleep(1)
+
+    async def text_completion(request):
+        return completion("answer")
+
+    async def remember(*args):
+        raise AssertionError("degraded answer remembered")
+
+    monkeypatch.setattr(handlers.env, "CHATBOT_RETRIEVAL_TIMEOUT", 0.01)
+    monkeypatch.setattr(handlers.openai, "embed", embed)
+    monkeypatch.setattr(handlers.openai, "text_completion", text_completion)
+    monkeypatch.setattr(handlers.pinecone, "get_context", get_context)
+    monkeypatch.setattr(handlers, "remember", remember)
+
+    request = handlers.OpenAIEmbeddingRequest(input="question?", namespace="example.com")
+    response = asyncio.run(handlers.main(request))
+
+    assert response.body == b"answer"
+    assert response.background is None
+
+
+def test_interrupted_stream_is_not_remembered(monkeypatch):
+    remembered = []
+
+    async def prepare(request):
+        return None, [1.0, 0.0], object(), False
+
+    async def stream_completion(request):
+        for token in ("a", "b", "c"):
+            yield token
+
+    async def remember(request, vector, text):
+        remembered.append(text)
+
+    monkeypatch.setattr(handlers, "prepare", prepare)
+    monkeypatch.setattr(handlers.openai, "stream_completion", stream_completion)
+    monkeypatch.setattr(handlers, "remember", remember)
+
+    request = handlers.OpenAIEmbeddingRequest(input="question?", namespace="example.com")
+
+    async def main():
+        response = await handlers.main_stream(request)
+        body = response.body_iterator
+        await body.__anext__()
+        await body.aclose()
+        await response.background()
+        response = await handlers.main_stream(request)
+        assert [token async for token in response.body_iterator] == ["a", "b", "c"]
+        await response.background()
+
+    asyncio.run(main())
+    assert remembered == ["abc"]
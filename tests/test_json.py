@@ -0,0 +1,20 @@
+from src.db.json import decode, loads_bytes
+from src.db.objects import FaunaTime, Ref
+
+
+def test_decode_works_in_place():
+    raw = loads_bytes(
+        b'{"owner": {"@ref": {"id": "1", "collection": {"@ref": {"id": "users",'
+        b' "collection": {"@ref": {"id": "collections"}}}}}},'
+        b' "seen": [{"@ts": "2023-01-01T00:00:00Z"}, {"plain": [1, 2]}]}'
+    )
+    seen = raw["seen"]
+    plain = seen[1]
+
+    decoded = decode(raw)
+
+    assert decoded is raw
+    assert isinstance(decoded["owner"], Ref) and decoded["owner"].id() == "1"
+    assert decoded["seen"] is seen
+    assert isinstance(seen[0], FaunaTime)
+    assert seen[1] is plain and plain == {"plain": [1, 2]}
@@ -0,0 +1,69 @@
+import asyncio
+
+from src.db.cache import ModelCache
+from src.models import FaunaModel
+
+
+class Note(FaunaModel):
+    text: str
+
+    class Config:
+        cache_ttl = 60
+
+
+def test_cached_values_are_copied_on_the_way_in():
+    cache = ModelCache(ttl=60)
+    value = [Note(text="a")]
+    cache.set("key", value)
+    value[0].text = "changed"
+    assert cache.get("key")[0].text == "a"
+
+
+def test_read_racing_an_invalidation_is_not_cached():
+    async def main():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def stale():
+            started.set()
+            await release.wait()
+            return Note(text="stale")
+
+        read = asyncio.ensure_future(Note._load(("key",), stale))
+        await started.wait()
+        Note._invalidate()
+        release.set()
+        assert (await read).text == "stale"
+        assert ModelCache.for_model(Note).get(("key",)) is None
+
+    asyncio.run(main())
+
+
+def test_read_during_a_write_is_not_kept(monkeypatch):
+    async def main():
+        committed = asyncio.Event()
+        state = {"text": "old"}
+
+        async def query(expr):
+            if isinstance(expr, bytes) and b'"update"' in expr:
+                await committed.wait()
+                state["text"] = "new"
+                return document(state["text"])
+            return document(state["text"])
+
+        monkeypatch.setattr(Note, "q", classmethod(lambda cls: query))
+        write = asyncio.ensure_future(Note.update("1", text="new"))
+        await asyncio.sleep(0)
+        assert (await Note.get("1")).text == "old"
+        committed.set()
+        await write
+        assert (await Note.get("1")).text == "new"
+
+    asyncio.run(main())
+
+
+def document(text):
+    return {
+        "ref": {"@ref": {"id": "1"}},
+        "ts": 1_000_000,
+        "data": {"text": text},
+    }
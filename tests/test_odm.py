@@ -0,0 +1,42 @@
+import asyncio
+
+from src.db import Field
+from src.db.json import to_wire
+from src.models import FaunaModel
+
+
+class Member(FaunaModel):
+    email: str = Field(..., unique=True)
+
+
+def document(ref, email, **extra):
+    return {
+        "ref": {"@ref": {"id": ref}},
+        "ts": 1_000_000,
+        "data": {"email": email},
+        **extra,
+    }
+
+
+def test_create_leaves_self_alone_when_the_document_exists(monkeypatch):
+    async def query(expr):
+        assert b'"merge"' in to_wire(expr)
+        return document("existing", "a@example.com", existing=True)
+
+    monkeypatch.setattr(Member, "q", classmethod(lambda cls: query))
+    member = Member(email="a@example.com")
+    found = asyncio.run(member.create())
+
+    assert found.ref == "existing"
+    assert member.ref is None and member.ts is None
+
+
+def test_create_sets_ref_of_a_new_document(monkeypatch):
+    async def query(expr):
+        return document("new", "b@example.com")
+
+    monkeypatch.setattr(Member, "q", classmethod(lambda cls: query))
+    member = Member(email="b@example.com")
+    created = asyncio.run(member.create())
+
+    assert created.ref == member.ref == "new"
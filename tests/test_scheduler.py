@@ -0,0 +1,63 @@
+import asyncio
+
+from src.db.scheduler import ApiError, CircuitOpenError, Scheduler
+
+URL = "https://api.example.com/v1"
+
+
+def half_open(scheduler: Scheduler):
+    host = scheduler.configure("api.example.com", retries=0, breaker_threshold=1)
+    host.breaker.failure()
+    host.breaker.opened_at -= host.breaker.timeout
+    assert host.breaker.state == "half-open"
+    return host
+
+
+def test_acquire_does_not_take_the_half_open_trial():
+    scheduler = Scheduler()
+    host = half_open(scheduler)
+
+    async def main():
+        await scheduler.acquire(URL)
+        await scheduler.acquire(URL)
+        return await scheduler.run(URL, lambda: asyncio.sleep(0, "ok"))
+
+    assert asyncio.run(main()) == "ok"
+    assert host.breaker.state == "closed"
+
+
+def test_cancelled_trial_is_released():
+    scheduler = Scheduler()
+    host = half_open(scheduler)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def main():
+        try:
+            await asyncio.wait_for(scheduler.run(URL, hang), 0.01)
+        except asyncio.TimeoutError:
+            pass
+        return await scheduler.run(URL, lambda: asyncio.sleep(0, "ok"))
+
+    assert asyncio.run(main()) == "ok"
+    assert host.breaker.state == "closed"
+
+
+def test_failed_trial_reopens_the_breaker():
+    scheduler = Scheduler()
+    host = half_open(scheduler)
+
+    async def fail():
+        raise ApiError(503, "unavailable")
+
+    async def main():
+        for _ in range(2):
+            try:
+                await scheduler.run(URL, fail)
+            except ApiError as exc:
+                last = exc
+        return last
+
+    assert isinstance(asyncio.run(main()), CircuitOpenError)
+    assert host.breaker.state == "open"
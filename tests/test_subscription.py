@@ -0,0 +1,65 @@
+import asyncio
+
+from src.db.subscription import Subscription
+
+
+class FakeClient:
+    """Serves one scripted stream per connection, then fails the next ones."""
+
+    def __init__(self, *connections):
+        self.connections = list(connections)
+        self.last_seen = []
+
+    async def stream(self, expr, last_seen_txn=None):
+        self.last_seen.append(last_seen_txn)
+        if not self.connections:
+            await asyncio.sleep(10)
+        for event in self.connections.pop(0):
+            yield event
+
+
+def event(txn, ref, kind="set"):
+    return {"type": kind, "txn": txn, "event": {"action": "add", "document": ref}}
+
+
+def collect(client, count):
+    subscription = Subscription(client, expr=None, backoff=0.001)
+
+    async def main():
+        events = []
+        async for item in subscription.listen():
+            events.append(item)
+            if len(events) == count:
+                return events
+
+    return asyncio.run(asyncio.wait_for(main(), 1))
+
+
+def test_every_event_of_a_transaction_is_delivered():
+    start = {"type": "start", "txn": 100, "event": 100}
+    client = FakeClient([start, event(200, "1"), event(200, "2"), event(200, "3")])
+    events = collect(client, 4)
+    assert [item["event"] for item in events[1:]] == [
+        {"action": "add", "document": ref} for ref in ("1", "2", "3")
+    ]
+
+
+def test_events_replayed_after_a_reconnect_are_dropped():
+    client = FakeClient(
+        [event(200, "1"), event(200, "2")],
+        [
+            {"type": "start", "txn": 200, "event": 200},
+            event(150, "0"),
+            event(200, "2"),
+            event(200, "3"),
+            event(300, "4"),
+        ],
+    )
+    events = collect(client, 5)
+    assert [item["event"]["document"] for item in events if item["type"] == "set"] == [
+        "1",
+        "2",
+        "3",
+        "4",
+    ]
+    assert client.last_seen == [None, 200]
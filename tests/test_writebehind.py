@@ -0,0 +1,25 @@
+import asyncio
+
+from src.tools.writebehind import WriteBehindQueue
+
+
+def test_settle_leaves_young_items_queued():
+    batches = []
+
+    async def write(items):
+        batches.append(items)
+
+    async def main():
+        queue = WriteBehindQueue(write, batch_size=10, interval=60)
+        queue.put(1)
+        await queue.settle(max_age=60)
+        assert batches == []
+        await queue.settle(max_age=0)
+        assert batches == [[1]]
+        for item in range(10):
+            queue.put(item)
+        await queue.settle(max_age=60)
+        assert batches[-1] == list(range(10))
+        await queue.close()
+
+    asyncio.run(main())